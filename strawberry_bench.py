@@ -0,0 +1,248 @@
+"""
+草莓知識百科產生器的效能測試
+
+以真實資料為樣本產生指定筆數的合成資料 (草莓品種 / 病蟲害 / 缺素)，
+分別量測讀取、標準化、生成網頁三個階段的時間與吞吐量，
+並可與先前儲存的基準結果比較，找出效能退步。
+
+    python strawberry_bench.py                         # 10^2 ~ 10^4 筆
+    python strawberry_bench.py --sizes 100,1000000     # 自訂筆數
+    python strawberry_bench.py --save-baseline         # 儲存為基準
+    python strawberry_bench.py --compare               # 與基準比較，退步時回傳 1
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+kb = importlib.import_module('網頁生成v2')
+
+BASELINE_FILE = 'bench_baseline.json'
+DEFAULT_SIZES = (100, 1000, 10000)
+# 合成資料中各分類的比例
+CATEGORY_MIX = (("草莓品種", 0.7), ("病蟲害", 0.2), ("缺素", 0.1))
+STAGES = ("load_data", "normalize_data", "generate_html")
+
+class CorpusSampler:
+    """從真實資料收集文字片段，用來組出外觀相近的合成資料"""
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        real = {}
+        base_dir = os.path.dirname(os.path.abspath(kb.__file__))
+        for path in (kb.VARIETIES_JSON, kb.DISEASE_JSON):
+            for category, _index, record in kb.iter_records(os.path.join(base_dir, path)):
+                real.setdefault(category, []).append(record)
+        self.real = real
+        texts = [r.get(key, "") for records in real.values() for r in records
+                 for key in ("育苗簡介", "外形外觀", "口味口感", "症狀", "防治方法")]
+        self.sentences = [s for t in texts for s in t.replace('\n', '。').split('。') if s]
+        self.chars = sorted({c for s in self.sentences for c in s if '一' <= c <= '鿿'})
+        self.images = [i for records in real.values() for r in records for i in r.get("img", [])]
+        self.sources = [u for records in real.values() for r in records for u in r.get("資料來源", [])]
+
+    def text(self, sentences):
+        return '。'.join(self.rng.choice(self.sentences) for _ in range(sentences)) + '。'
+
+    def name(self, index):
+        return ''.join(self.rng.choice(self.chars) for _ in range(self.rng.randint(2, 4))) + f"{index}號"
+
+    def sample(self, items, low, high):
+        return self.rng.sample(items, min(len(items), self.rng.randint(low, high)))
+
+    def record(self, category, index):
+        rng = self.rng
+        template = rng.choice(self.real[category])
+        record = {
+            "名稱": self.name(index),
+            "資料來源": self.sample(self.sources, 0, 3),
+            "img": self.sample(self.images, 0, 4),
+        }
+        if category == "草莓品種":
+            record.update({
+                "糖度": round(rng.uniform(6, 18) * 2) / 2,
+                "育苗簡介": self.text(rng.randint(3, 8)),
+                "外形外觀": self.text(2),
+                "口味口感": self.text(2),
+                "tag": dict(template.get("tag", {})),
+            })
+        elif category == "病蟲害":
+            record.update({
+                "症狀": self.text(rng.randint(2, 5)),
+                "防治方法": self.text(2),
+                "tag": dict(template.get("tag", {})),
+            })
+        else:
+            record.update({
+                "症狀": self.text(rng.randint(2, 4)),
+                "缺哪種元素": template.get("缺哪種元素", "氮"),
+            })
+        return record
+
+def write_corpus(size, directory, seed=0):
+    """產生 size 筆合成資料，逐筆寫入與真實資料相同格式的兩個檔案"""
+    sampler = CorpusSampler(seed)
+    counts = {category: max(1, int(size * ratio)) for category, ratio in CATEGORY_MIX}
+    counts["草莓品種"] += size - sum(counts.values())
+    layout = {
+        os.path.join(directory, "varieties.json"): ["草莓品種"],
+        os.path.join(directory, "disease.json"): ["病蟲害", "缺素"],
+    }
+    for path, categories in layout.items():
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{')
+            for c, category in enumerate(categories):
+                f.write((',' if c else '') + json.dumps(category, ensure_ascii=False) + ':[')
+                for i in range(counts[category]):
+                    if i:
+                        f.write(',\n')
+                    f.write(json.dumps(sampler.record(category, i), ensure_ascii=False))
+                f.write(']')
+            f.write('}')
+    return list(layout)
+
+def _consume(iterable):
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+def _timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_size(size, repeat=3, memory=False):
+    """
+    量測單一筆數的各階段時間。管線是串流的，無法單獨執行後段，
+    因此依序量測 讀取、讀取+標準化、讀取+標準化+生成，再相減得到各階段時間。
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_corpus(size, directory)
+        input_bytes = sum(os.path.getsize(p) for p in files)
+
+        def load():
+            return _consume(kb.iter_sources(files))
+
+        def pipeline():
+            return kb.dedupe_items(kb.build_pipeline(kb.iter_sources(files)), kb.DuplicateDetector())
+
+        def normalize():
+            return _consume(pipeline())
+
+        def generate():
+            items = pipeline()
+            return sum(len(chunk) for chunk in kb.iter_html_chunks(items))
+
+        t_load = _timed(load, repeat)
+        t_normalize = _timed(normalize, repeat)
+        t_generate = _timed(generate, repeat)
+        result = {
+            "records": size,
+            "input_bytes": input_bytes,
+            "stages": {
+                "load_data": t_load,
+                "normalize_data": max(t_normalize - t_load, 0.0),
+                "generate_html": max(t_generate - t_normalize, 0.0),
+            },
+            "total_s": t_generate,
+        }
+        if memory:
+            tracemalloc.start()
+            generate()
+            result["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result
+
+def print_result(result):
+    size = result["records"]
+    line = [f"{size:>9,} 筆"]
+    for stage in STAGES:
+        seconds = result["stages"][stage]
+        rate = size / seconds if seconds > 0 else float('inf')
+        line.append(f"{stage} {seconds * 1000:9.1f} ms ({rate:,.0f} 筆/s)")
+    line.append(f"輸入 {result['input_bytes'] / result['total_s'] / 1e6:6.1f} MB/s")
+    if "peak_traced_bytes" in result:
+        line.append(f"記憶體高峰 {result['peak_traced_bytes'] / 1e6:.1f} MB")
+    print(" | ".join(line))
+
+def compare(results, baseline, tolerance):
+    """與基準比較各階段時間，回傳退步項目清單"""
+    previous = {r["records"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = previous.get(result["records"])
+        if base is None:
+            continue
+        for stage in STAGES:
+            old, new = base["stages"][stage], result["stages"][stage]
+            # 過短的時間受雜訊影響太大，不列入比較
+            if old < 0.001:
+                continue
+            ratio = new / old
+            status = "退步" if ratio > 1 + tolerance else "正常"
+            print(f"{result['records']:>9,} 筆 {stage:<15} {old * 1000:9.1f} -> {new * 1000:9.1f} ms "
+                  f"({ratio:5.2f}x) {status}")
+            if ratio > 1 + tolerance:
+                regressions.append((result["records"], stage, ratio))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="草莓知識百科產生器效能測試")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="以逗號分隔的資料筆數 (預設 100,1000,10000)")
+    parser.add_argument('--repeat', type=int, default=3, help="每個階段重複次數，取最短時間")
+    parser.add_argument('--memory', action='store_true', help="另外量測記憶體高峰 (較慢)")
+    parser.add_argument('--save-baseline', nargs='?', const=BASELINE_FILE, metavar='FILE',
+                        help=f"將結果儲存為基準 (預設 {BASELINE_FILE})")
+    parser.add_argument('--compare', nargs='?', const=BASELINE_FILE, metavar='FILE',
+                        help=f"與基準比較 (預設 {BASELINE_FILE})，有退步時結束碼為 1")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="允許的變慢比例 (預設 0.2 即 20%%)")
+    parser.add_argument('--output', metavar='FILE', help="將結果輸出為 JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    results = []
+    for size in sizes:
+        result = run_size(size, args.repeat, args.memory)
+        print_result(result)
+        results.append(result)
+
+    data = {
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"基準已儲存至: {args.save_baseline}")
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"錯誤: 找不到基準檔案 {args.compare}")
+            return 2
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"發現 {len(regressions)} 項效能退步")
+            return 1
+        print("沒有發現效能退步")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
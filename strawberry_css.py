@@ -0,0 +1,403 @@
+"""
+草莓知識百科的靜態樣式產生器
+
+掃描網頁模板與產生器原始碼中出現的 class 名稱 (如同 Tailwind 的 content 掃描)，
+只為實際用到的 Tailwind 工具類別與 Font Awesome 圖示產生 CSS，
+讓網頁不必在瀏覽器端載入 Tailwind CDN 即時編譯，也不必下載完整的 Font Awesome 樣式表。
+
+只支援網頁用到的 Tailwind v3 子集: 間距、尺寸、顏色 (含 /透明度)、排版、邊框、陰影、
+轉場、變形，以及 hover / focus / group-hover / dark / sm / md / lg 變體。
+"""
+import re
+
+# Tailwind v3 預設色盤中網頁用到的色系，strawberry 與模板中 tailwind.config 的設定相同
+COLORS = {
+    "slate": {"50": "#f8fafc", "100": "#f1f5f9", "200": "#e2e8f0", "300": "#cbd5e1", "400": "#94a3b8",
+              "500": "#64748b", "600": "#475569", "700": "#334155", "800": "#1e293b", "900": "#0f172a"},
+    "gray": {"50": "#f9fafb", "100": "#f3f4f6", "200": "#e5e7eb", "300": "#d1d5db", "400": "#9ca3af",
+             "500": "#6b7280", "600": "#4b5563", "700": "#374151", "800": "#1f2937", "900": "#111827"},
+    "red": {"50": "#fef2f2", "100": "#fee2e2", "200": "#fecaca", "300": "#fca5a5", "400": "#f87171",
+            "500": "#ef4444", "600": "#dc2626", "700": "#b91c1c", "800": "#991b1b", "900": "#7f1d1d"},
+    "orange": {"50": "#fff7ed", "100": "#ffedd5", "200": "#fed7aa", "300": "#fdba74", "400": "#fb923c",
+               "500": "#f97316", "600": "#ea580c", "700": "#c2410c", "800": "#9a3412", "900": "#7c2d12"},
+    "yellow": {"50": "#fefce8", "100": "#fef9c3", "200": "#fef08a", "300": "#fde047", "400": "#facc15",
+               "500": "#eab308", "600": "#ca8a04", "700": "#a16207", "800": "#854d0e", "900": "#713f12"},
+    "blue": {"50": "#eff6ff", "100": "#dbeafe", "200": "#bfdbfe", "300": "#93c5fd", "400": "#60a5fa",
+             "500": "#3b82f6", "600": "#2563eb", "700": "#1d4ed8", "800": "#1e40af", "900": "#1e3a8a"},
+    "indigo": {"50": "#eef2ff", "100": "#e0e7ff", "200": "#c7d2fe", "300": "#a5b4fc", "400": "#818cf8",
+               "500": "#6366f1", "600": "#4f46e5", "700": "#4338ca", "800": "#3730a3", "900": "#312e81"},
+    "pink": {"50": "#fdf2f8", "100": "#fce7f3", "200": "#fbcfe8", "300": "#f9a8d4", "400": "#f472b6",
+             "500": "#ec4899", "600": "#db2777", "700": "#be185d", "800": "#9d174d", "900": "#831843"},
+    "strawberry": {"50": "#fff1f2", "100": "#ffe4e6", "500": "#f43f5e", "600": "#e11d48",
+                   "700": "#be123c", "900": "#881337"},
+}
+SPECIAL_COLORS = {"white": "#ffffff", "black": "#000000"}
+
+SCREENS = (("sm", "640px"), ("md", "768px"), ("lg", "1024px"))
+PSEUDO_VARIANTS = {"hover": ":hover", "focus": ":focus"}
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"), "6xl": ("3.75rem", "1"),
+}
+RADII = {"": "0.25rem", "sm": "0.125rem", "md": "0.375rem", "lg": "0.5rem", "xl": "0.75rem",
+         "2xl": "1rem", "full": "9999px", "none": "0px"}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "none": "0 0 #0000",
+}
+MAX_WIDTHS = {"xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem",
+              "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+              "full": "100%", "none": "none"}
+BLURS = {"sm": "4px", "": "8px", "md": "12px", "lg": "16px", "xl": "24px"}
+
+_EASE = "cubic-bezier(0.4, 0, 0.2, 1)"
+TRANSITIONS = {
+    "": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, "
+        "box-shadow, transform, filter, backdrop-filter",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+EASINGS = {"linear": "linear", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)",
+           "in-out": "cubic-bezier(0.4, 0, 0.2, 1)"}
+# 覆寫 transition-* 預設值的類別，與 Tailwind 相同排在 transition-* 之後
+_OVERRIDES = ("duration-", "ease-")
+_TRANSFORM = ("translate(var(--tw-translate-x), var(--tw-translate-y)) "
+              "scale(var(--tw-scale-x), var(--tw-scale-y))")
+_BOX_SHADOW = ("var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), "
+               "var(--tw-shadow, 0 0 #0000)")
+
+# 不帶數值、直接對應宣告的類別
+STATIC = {
+    "block": "display: block", "inline-block": "display: inline-block", "inline": "display: inline",
+    "flex": "display: flex", "inline-flex": "display: inline-flex", "grid": "display: grid",
+    "hidden": "display: none",
+    "absolute": "position: absolute", "fixed": "position: fixed", "relative": "position: relative",
+    "sticky": "position: sticky",
+    "flex-row": "flex-direction: row", "flex-col": "flex-direction: column", "flex-wrap": "flex-wrap: wrap",
+    "flex-1": "flex: 1 1 0%", "flex-none": "flex: none", "shrink-0": "flex-shrink: 0",
+    "items-start": "align-items: flex-start", "items-center": "align-items: center",
+    "items-end": "align-items: flex-end",
+    "justify-start": "justify-content: flex-start", "justify-center": "justify-content: center",
+    "justify-end": "justify-content: flex-end", "justify-between": "justify-content: space-between",
+    "overflow-hidden": "overflow: hidden", "overflow-auto": "overflow: auto",
+    "overflow-y-auto": "overflow-y: auto", "overflow-x-auto": "overflow-x: auto",
+    "object-contain": "object-fit: contain", "object-cover": "object-fit: cover",
+    "text-left": "text-align: left", "text-center": "text-align: center", "text-right": "text-align: right",
+    "font-normal": "font-weight: 400", "font-medium": "font-weight: 500",
+    "font-semibold": "font-weight: 600", "font-bold": "font-weight: 700",
+    "leading-none": "line-height: 1", "leading-tight": "line-height: 1.25",
+    "leading-snug": "line-height: 1.375", "leading-normal": "line-height: 1.5",
+    "leading-relaxed": "line-height: 1.625",
+    "tracking-tight": "letter-spacing: -0.025em", "tracking-wide": "letter-spacing: 0.025em",
+    "tracking-widest": "letter-spacing: 0.1em",
+    "truncate": "overflow: hidden; text-overflow: ellipsis; white-space: nowrap",
+    "underline": "text-decoration-line: underline", "break-all": "word-break: break-all",
+    "whitespace-nowrap": "white-space: nowrap",
+    "cursor-pointer": "cursor: pointer", "select-none": "user-select: none",
+    "pointer-events-none": "pointer-events: none", "pointer-events-auto": "pointer-events: auto",
+    "scroll-smooth": "scroll-behavior: smooth",
+    "outline-none": "outline: 2px solid transparent; outline-offset: 2px",
+    "transform": f"transform: {_TRANSFORM}",
+    "border-transparent": "border-color: transparent", "bg-transparent": "background-color: transparent",
+    "mx-auto": "margin-left: auto; margin-right: auto", "mt-auto": "margin-top: auto",
+    "ml-auto": "margin-left: auto", "w-auto": "width: auto", "h-auto": "height: auto",
+    "w-full": "width: 100%", "h-full": "height: 100%", "w-screen": "width: 100vw", "h-screen": "height: 100vh",
+    "min-h-screen": "min-height: 100vh", "min-w-0": "min-width: 0px",
+}
+
+SPACING_PREFIXES = {
+    "p": ("padding",), "px": ("padding-left", "padding-right"), "py": ("padding-top", "padding-bottom"),
+    "pt": ("padding-top",), "pr": ("padding-right",), "pb": ("padding-bottom",), "pl": ("padding-left",),
+    "m": ("margin",), "mx": ("margin-left", "margin-right"), "my": ("margin-top", "margin-bottom"),
+    "mt": ("margin-top",), "mr": ("margin-right",), "mb": ("margin-bottom",), "ml": ("margin-left",),
+    "w": ("width",), "h": ("height",), "gap": ("gap",),
+    "top": ("top",), "right": ("right",), "bottom": ("bottom",), "left": ("left",),
+    "inset": ("top", "right", "bottom", "left"),
+    "min-w": ("min-width",), "min-h": ("min-height",), "max-h": ("max-height",), "max-w": ("max-width",),
+    "z": ("z-index",),
+}
+
+PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb;\
+--tw-translate-x:0;--tw-translate-y:0;--tw-scale-x:1;--tw-scale-y:1;\
+--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,\
+"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji"}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;\
+color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type=button],[type=reset],[type=submit]{-webkit-appearance:button;background-color:transparent;\
+background-image:none}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role=button]{cursor:pointer}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+# Font Awesome 6.4.0 (Free) 的字型與網頁用到的圖示字碼
+FA_VERSION = "6.4.0"
+FA_WEBFONTS = f"https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FA_VERSION}/webfonts/"
+FA_STYLES = {"fa-solid": (900, "fa-solid-900"), "fa-regular": (400, "fa-regular-400")}
+FA_ICONS = {
+    "angle-down": "f107", "angle-up": "f106", "arrow-up": "f062", "bacteria": "e059",
+    "book-open": "f518", "bug": "f188", "chart-simple": "e473", "chevron-left": "f053",
+    "chevron-right": "f054", "desktop": "f390", "droplet": "f043", "eye": "f06e",
+    "filter": "f0b0", "flask": "f0c3", "layer-group": "f5fd", "leaf": "f06c", "link": "f0c1",
+    "magnifying-glass": "f002", "search": "f002", "moon": "f186", "rotate-left": "f2ea",
+    "seedling": "f4d8", "shield-virus": "e06c", "sun": "f185", "utensils": "f2e7", "xmark": "f00d",
+}
+
+_TOKEN_RE = re.compile(r"[^\s\"'`<>={}();,]+")
+_CLASS_ATTR_RE = re.compile(r'(?<![:\w-])class="([^"]*)"')
+_BOUND_CLASS_RE = re.compile(r':class="([^"]*)"')
+_TRANSITION_ATTR_RE = re.compile(r'x-transition:(?:enter|leave)(?:-start|-end)?="([^"]*)"')
+_STYLE_CLASS_RE = re.compile(r'\.([A-Za-z][\w-]*)')
+
+def escape(name):
+    """將類別名稱轉為 CSS 選擇器 (跳脫 : / . [ ] 等符號)"""
+    return re.sub(r'([^A-Za-z0-9_-])', r'\\\1', name)
+
+def _spacing(value):
+    if value == "0":
+        return "0px"
+    if value == "px":
+        return "1px"
+    if re.fullmatch(r'\d+(\.5)?', value):
+        rem = float(value) / 4
+        return f"{rem:g}rem"
+    return None
+
+def _arbitrary(value):
+    match = re.fullmatch(r'\[([^\]\s]+)\]', value)
+    return match.group(1).replace('_', ' ') if match else None
+
+def _color(value):
+    """顏色名稱 (可帶 /透明度) -> CSS 顏色，不支援時回傳 None"""
+    name, _, alpha = value.partition('/')
+    if name in SPECIAL_COLORS:
+        hex_value = SPECIAL_COLORS[name]
+    else:
+        family, _, shade = name.rpartition('-')
+        hex_value = COLORS.get(family, {}).get(shade)
+    if hex_value is None:
+        return None
+    r, g, b = (int(hex_value[i:i + 2], 16) for i in (1, 3, 5))
+    if not alpha:
+        return f"rgb({r} {g} {b})"
+    if not alpha.isdigit():
+        return None
+    return f"rgb({r} {g} {b} / {int(alpha) / 100:g})"
+
+def _sized(prefix, value):
+    """依前綴取得長度值: 間距刻度、分數、任意值 [..]，以及各屬性特有的關鍵字"""
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        return arbitrary
+    if prefix == "z":
+        return value if value.isdigit() else None
+    if prefix == "max-w":
+        return MAX_WIDTHS.get(value)
+    if prefix in ("min-h", "max-h", "min-w") and value in ("full", "screen"):
+        return "100%" if value == "full" else ("100vh" if prefix.endswith("h") else "100vw")
+    if value == "full":
+        return "100%"
+    if value == "auto":
+        return "auto"
+    fraction = re.fullmatch(r'(\d+)/(\d+)', value)
+    if fraction:
+        return f"{int(fraction.group(1)) / int(fraction.group(2)) * 100:g}%"
+    return _spacing(value)
+
+def utility(name):
+    """
+    單一工具類別 (不含變體) -> (選擇器後綴, 宣告)
+    選擇器後綴用於需要作用在子元素上的類別 (如 space-y)，不支援時回傳 None
+    """
+    if name in STATIC:
+        return "", STATIC[name]
+    match = re.fullmatch(r'(-?)([a-z]+(?:-[a-z]+)?)-(.+)', name)
+    if not match:
+        return _keyword_utility(name)
+    negative, prefix, value = match.groups()
+    if prefix in SPACING_PREFIXES:
+        length = _sized(prefix, value)
+        if length is None:
+            return None
+        if negative:
+            length = f"-{length}"
+        return "", "; ".join(f"{prop}: {length}" for prop in SPACING_PREFIXES[prefix])
+    if prefix == "space-y" and _spacing(value):
+        return (" > :not([hidden]) ~ :not([hidden])", f"margin-top: {_spacing(value)}")
+    if prefix == "space-x" and _spacing(value):
+        return (" > :not([hidden]) ~ :not([hidden])", f"margin-left: {_spacing(value)}")
+    if prefix == "grid-cols" and value.isdigit():
+        return "", f"grid-template-columns: repeat({value}, minmax(0, 1fr))"
+    if prefix == "opacity" and value.isdigit():
+        return "", f"opacity: {int(value) / 100:g}"
+    if prefix == "scale" and value.isdigit():
+        scale = f"{int(value) / 100:g}"
+        return "", f"--tw-scale-x: {scale}; --tw-scale-y: {scale}; transform: {_TRANSFORM}"
+    if prefix == "duration" and value.isdigit():
+        return "", f"transition-duration: {value}ms"
+    if prefix == "ring" and value.isdigit():
+        return "", (f"--tw-ring-offset-shadow: 0 0 #0000; "
+                    f"--tw-ring-shadow: 0 0 0 {value}px var(--tw-ring-color); box-shadow: {_BOX_SHADOW}")
+    if prefix == "border" and value in ("t", "b", "l", "r"):
+        side = {"t": "top", "b": "bottom", "l": "left", "r": "right"}[value]
+        return "", f"border-{side}-width: 1px"
+    if prefix in ("border-t", "border-b", "border-l", "border-r") and value.isdigit():
+        side = {"t": "top", "b": "bottom", "l": "left", "r": "right"}[prefix[-1]]
+        return "", f"border-{side}-width: {value}px"
+    return _keyword_utility(name)
+
+def _keyword_utility(name):
+    """text-*、bg-*、border-*、rounded-*、shadow-*、transition-*、ease-* 等以關鍵字或顏色區分的類別"""
+    for prefix, prop in (("bg-", "background-color"), ("text-", "color"),
+                         ("border-", "border-color"), ("ring-", "--tw-ring-color")):
+        if name.startswith(prefix):
+            value = name[len(prefix):]
+            if prefix == "text-" and value in FONT_SIZES:
+                size, height = FONT_SIZES[value]
+                return "", f"font-size: {size}; line-height: {height}"
+            if prefix == "border-" and value.isdigit():
+                return "", f"border-width: {value}px"
+            color = _color(value)
+            return ("", f"{prop}: {color}") if color else None
+    if name == "border":
+        return "", "border-width: 1px"
+    if name == "rounded" or name.startswith("rounded-"):
+        radius = RADII.get(name[len("rounded-"):] if name != "rounded" else "")
+        return ("", f"border-radius: {radius}") if radius else None
+    if name == "shadow" or name.startswith("shadow-"):
+        shadow = SHADOWS.get(name[len("shadow-"):] if name != "shadow" else "")
+        return ("", f"--tw-shadow: {shadow}; box-shadow: {_BOX_SHADOW}") if shadow else None
+    if name == "transition" or name.startswith("transition-"):
+        props = TRANSITIONS.get(name[len("transition-"):] if name != "transition" else "")
+        if props is None:
+            return None
+        return "", (f"transition-property: {props}; transition-timing-function: {_EASE}; "
+                    f"transition-duration: 150ms")
+    if name.startswith("ease-"):
+        easing = EASINGS.get(name[len("ease-"):])
+        return ("", f"transition-timing-function: {easing}") if easing else None
+    if name.startswith("backdrop-blur"):
+        blur = BLURS.get(name[len("backdrop-blur-"):] if name != "backdrop-blur" else "")
+        return ("", f"-webkit-backdrop-filter: blur({blur}); backdrop-filter: blur({blur})") if blur else None
+    return None
+
+def rule(token):
+    """
+    含變體的類別 -> (排序鍵, CSS 規則)，不是工具類別時回傳 None
+    排序: 無變體 < hover/focus < dark < 斷點 (由小到大)，與 Tailwind 的輸出順序相同；
+    同一組變體中 duration-* / ease-* 排在最後，才能覆寫 transition-* 的預設值
+    """
+    *variants, name = token.split(':')
+    result = utility(name)
+    if result is None:
+        return None
+    suffix, declarations = result
+    selector = '.' + escape(token)
+    screen = None
+    dark = False
+    pseudo = ""
+    for variant in variants:
+        if variant in PSEUDO_VARIANTS:
+            pseudo += PSEUDO_VARIANTS[variant]
+        elif variant == "group-hover":
+            selector = f".group:hover {selector}"
+        elif variant == "dark":
+            dark = True
+        elif variant in dict(SCREENS):
+            if screen is not None:
+                return None
+            screen = variant
+        else:
+            return None
+    selector += pseudo + suffix
+    if dark:
+        selector = f".dark {selector}"
+    css = f"{selector} {{ {declarations} }}"
+    screen_order = [s for s, _ in SCREENS].index(screen) + 1 if screen else 0
+    if screen:
+        css = f"@media (min-width: {dict(SCREENS)[screen]}) {{ {css} }}"
+    order = (screen_order, dark, bool(pseudo) or any(v == "group-hover" for v in variants),
+             name.startswith(_OVERRIDES))
+    return order, css
+
+def icon_rules(tokens):
+    """Font Awesome 子集: 只輸出用到的字型樣式與圖示字碼"""
+    styles = [style for style in FA_STYLES if style in tokens]
+    icons = sorted(token[3:] for token in tokens if token.startswith("fa-") and token[3:] in FA_ICONS)
+    if not styles and not icons:
+        return []
+    lines = []
+    for style in styles:
+        weight, font = FA_STYLES[style]
+        lines.append(f'@font-face {{ font-family: "Font Awesome 6 Free"; font-style: normal; '
+                     f'font-weight: {weight}; font-display: block; '
+                     f'src: url("{FA_WEBFONTS}{font}.woff2") format("woff2"); }}')
+    lines.append(", ".join(f".{style}" for style in styles or FA_STYLES) +
+                 ' { -moz-osx-font-smoothing: grayscale; -webkit-font-smoothing: antialiased; '
+                 'display: inline-block; font-style: normal; font-variant: normal; line-height: 1; '
+                 'text-rendering: auto; font-family: "Font Awesome 6 Free"; }')
+    for style in styles:
+        lines.append(f".{style} {{ font-weight: {FA_STYLES[style][0]}; }}")
+    for icon in icons:
+        lines.append(f'.fa-{icon}::before {{ content: "\\{FA_ICONS[icon]}"; }}')
+    return lines
+
+def scan(*texts):
+    """從文字中取出所有可能是 class 名稱的片段 (與 Tailwind 相同，寧可多取也不漏掉)"""
+    tokens = set()
+    for text in texts:
+        tokens.update(_TOKEN_RE.findall(text))
+    return tokens
+
+def declared_classes(template):
+    """模板中實際當作 class 使用的名稱: class 屬性、:class 運算式中的字串與 x-transition:* 屬性"""
+    names = set()
+    for match in _CLASS_ATTR_RE.finditer(template):
+        names.update(match.group(1).split())
+    for match in _TRANSITION_ATTR_RE.finditer(template):
+        names.update(match.group(1).split())
+    for match in _BOUND_CLASS_RE.finditer(template):
+        for literal in re.findall(r"'([^']*)'", match.group(1)):
+            names.update(literal.split())
+    return names
+
+def build_stylesheet(template, *sources):
+    """
+    依模板與其他來源 (如產生器原始碼中的圖示類別) 產生樣式表
+    回傳 (css, 無法產生樣式的類別清單)；模板 <style> 中自訂的類別不算在內
+    """
+    tokens = scan(template, *sources)
+    rules = sorted({r for r in map(rule, tokens) if r is not None})
+    lines = [PREFLIGHT.strip()]
+    lines.extend(icon_rules(tokens))
+    lines.extend(css for _, css in rules)
+    custom = set()
+    for style in re.findall(r'<style>(.*?)</style>', template, re.S):
+        custom.update(_STYLE_CLASS_RE.findall(style))
+    unsupported = sorted(
+        name for name in declared_classes(template)
+        if rule(name) is None and name not in custom and name != "group"
+        and not (name.startswith("fa-") and (name[3:] in FA_ICONS or name in FA_STYLES))
+    )
+    return '\n'.join(lines) + '\n', unsupported
@@ -0,0 +1,338 @@
+"""
+草莓知識百科的網路存取: 外部圖片下載快取與連結檢查
+
+兩者共用以主機分組、保留 keep-alive 連線的 _ConnectionPool，在執行緒池中送出請求，
+以 asyncio 控制同時請求數。只在 --remote-images 與 --check-links 時使用。
+
+    from strawberry_net import LinkChecker
+    checker = LinkChecker()
+    results = checker.check(["https://example.com/"])
+    checker.save()
+
+快取檔案預設以暫存檔 + rename 寫入；產生器傳入自己的 atomic_write (內容相同時不覆寫)。
+"""
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+def write_file(filepath, data):
+    """以同目錄的暫存檔寫入後 rename，中斷時不會留下寫到一半的檔案"""
+    tmp_path = f"{filepath}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# --- 外部圖片下載 ---
+
+# 外部圖片的下載快取: 內容以雜湊命名，index.json 記錄網址對應的雜湊與 ETag
+IMAGE_CACHE_DIR = '.image_cache'
+# 在此時間內檢查過的圖片直接使用快取，不連線重新驗證
+REMOTE_IMAGE_MAX_AGE = 7 * 24 * 3600
+REMOTE_IMAGE_TIMEOUT = 20
+REMOTE_IMAGE_MAX_BYTES = 32 * 1024 * 1024
+
+class _ConnectionPool:
+    """
+    依 (協定, 主機, 連接埠) 保留 keep-alive 的 http.client 連線，
+    同一主機的多張圖片重複使用連線，不必每次重新 TCP / TLS 交握。
+    """
+    def __init__(self, timeout=REMOTE_IMAGE_TIMEOUT):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, key):
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout)
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _send(self, method, key, path, headers):
+        headers = {'User-Agent': 'strawberry-kb-builder', **headers}
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, path, headers=headers)
+            return conn, conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            conn.close()
+            if not reused:
+                raise
+        # 閒置的連線可能已被伺服器關閉，改用新連線重試一次
+        conn = self._connect(key)
+        conn.request(method, path, headers=headers)
+        return conn, conn.getresponse()
+
+    def request(self, url, headers=None, method='GET', redirects=5,
+                max_bytes=REMOTE_IMAGE_MAX_BYTES, truncate=False):
+        """
+        (在執行緒中) 送出請求，回傳 (狀態碼, 回應標頭, 內容)，自動跟隨轉址
+        內容超過 max_bytes 時關閉連線並丟出 ValueError；truncate 為 True 時改為只回傳前 max_bytes 個位元組
+        """
+        for _ in range(redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.hostname, parts.port)
+            path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+            conn, response = self._send(method, key, path, headers or {})
+            body = response.read(max_bytes + 1)
+            if len(body) > max_bytes:
+                # 剩餘的內容沒有讀完，連線無法再使用
+                conn.close()
+                if not truncate:
+                    raise ValueError("檔案過大")
+                body = body[:max_bytes]
+            elif response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            location = response.getheader('Location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return response.status, dict(response.getheaders()), body
+        raise ValueError("轉址次數過多")
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+class RemoteImageFetcher:
+    """
+    以 asyncio 同時下載多張外部圖片，存入以內容雜湊命名的本機快取
+    快取中的圖片在 max_age 秒內直接使用；過期後以 ETag / Last-Modified 重新驗證，
+    伺服器回應 304 時不必重新下載。連線失敗時沿用舊的快取，建置可在離線時進行。
+    submit() 可從任何執行緒呼叫，回傳 concurrent.futures.Future，結果為本機路徑或 None。
+    """
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, max_age=REMOTE_IMAGE_MAX_AGE, concurrency=8,
+                 write=write_file):
+        self.cache_dir = cache_dir
+        self.write = write
+        self.max_age = max_age
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.index = self._load_index()
+        self.pool = _ConnectionPool()
+        self.threads = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = None
+        self.concurrency = concurrency
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self._futures = {}
+        self.downloaded = 0
+        self.revalidated = 0
+        self.cached = 0
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"讀取 {self.index_path} 時發生錯誤，將重新下載外部圖片: {e}")
+            return {}
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], digest)
+
+    def submit(self, url):
+        future = self._futures.get(url)
+        if future is None:
+            future = self._futures[url] = asyncio.run_coroutine_threadsafe(self._fetch(url), self.loop)
+        return future
+
+    async def _fetch(self, url):
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        entry = self.index.get(url)
+        path = self.object_path(entry["sha256"]) if entry else None
+        if path and not os.path.exists(path):
+            entry = path = None
+        if entry and time.time() - entry.get("checked", 0) < self.max_age:
+            self.cached += 1
+            return path
+        headers = {}
+        if entry and entry.get("etag"):
+            headers['If-None-Match'] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers['If-Modified-Since'] = entry["last_modified"]
+        try:
+            async with self.semaphore:
+                status, response_headers, body = await self.loop.run_in_executor(
+                    self.threads, self.pool.request, url, headers)
+        except Exception as e:
+            return self._fallback(url, path, e)
+        if status == 304 and entry:
+            entry["checked"] = time.time()
+            self.revalidated += 1
+            return path
+        if status != 200:
+            return self._fallback(url, path, f"HTTP {status}")
+        headers = {k.lower(): v for k, v in response_headers.items()}
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.write(path, body)
+        self.index[url] = {
+            "sha256": digest, "etag": headers.get('etag'), "last_modified": headers.get('last-modified'),
+            "content_type": headers.get('content-type'), "checked": time.time(),
+        }
+        self.downloaded += 1
+        return path
+
+    def _fallback(self, url, path, error):
+        if path:
+            print(f"警告: 無法更新外部圖片 {url} ({error})，沿用快取")
+            self.cached += 1
+            return path
+        print(f"警告: 無法下載外部圖片 {url} ({error})")
+        self.failed += 1
+        return None
+
+    def close(self):
+        """等待下載完成，寫出索引並關閉連線"""
+        for future in list(self._futures.values()):
+            try:
+                future.result()
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.threads.shutdown()
+        self.pool.close()
+        if self._futures:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.write(self.index_path, json.dumps(self.index, ensure_ascii=False, indent=1,
+                                                   sort_keys=True).encode('utf-8'))
+
+# --- 連結檢查 ---
+LINK_CACHE = '.link_cache.json'
+# 檢查結果在此時間內直接沿用
+LINK_CACHE_TTL = 24 * 3600
+LINK_CONCURRENCY = 64
+# 每個主機同時進行的請求數與每秒請求數上限，避免對政府網站造成負擔
+LINK_HOST_CONCURRENCY = 4
+LINK_HOST_RATE = 10
+LINK_TIMEOUT = 10
+# 以 GET 檢查時最多讀取的位元組數 (伺服器忽略 Range 時不下載整個檔案)
+LINK_PROBE_BYTES = 1024
+
+class LinkChecker:
+    """
+    以 asyncio 同時檢查大量網址是否有效
+    先送 HEAD，伺服器不支援時改用只要求第一個位元組的 GET；同一主機共用 keep-alive 連線，
+    並依主機限制同時請求數與速率。結果存在 LINK_CACHE，TTL 內不重新檢查。
+    """
+    def __init__(self, cache_path=LINK_CACHE, ttl=LINK_CACHE_TTL, concurrency=LINK_CONCURRENCY,
+                 host_concurrency=LINK_HOST_CONCURRENCY, host_rate=LINK_HOST_RATE, timeout=LINK_TIMEOUT,
+                 write=write_file):
+        self.cache_path = cache_path
+        self.write = write
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.host_rate = host_rate
+        self.pool = _ConnectionPool(timeout)
+        self.results = self._load_cache()
+        self.checked = 0
+        self.cached = 0
+        self._hosts = {}
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"讀取 {self.cache_path} 時發生錯誤，將重新檢查所有連結: {e}")
+            return {}
+
+    def check(self, urls):
+        """檢查所有網址 (重複的只檢查一次)，回傳 {網址: 結果}"""
+        urls = list(dict.fromkeys(urls))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as threads:
+            results = asyncio.run(self._check_all(urls, threads))
+        self.pool.close()
+        return dict(zip(urls, results))
+
+    async def _check_all(self, urls, threads):
+        return await asyncio.gather(*(self._check(url, threads) for url in urls))
+
+    def _host_slot(self, host):
+        """每個主機的同時請求數限制與下一個可送出請求的時間"""
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = {"semaphore": asyncio.Semaphore(self.host_concurrency), "next": 0.0}
+        return slot
+
+    async def _check(self, url, threads):
+        entry = self.results.get(url)
+        if entry and time.time() - entry.get("checked", 0) < self.ttl:
+            self.cached += 1
+            return entry
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            result = {"ok": False, "status": None, "error": "不支援的網址", "checked": time.time()}
+            self.results[url] = result
+            return result
+        slot = self._host_slot(parts.hostname)
+        loop = asyncio.get_running_loop()
+        async with slot["semaphore"]:
+            now = loop.time()
+            start = max(now, slot["next"])
+            slot["next"] = start + 1 / self.host_rate
+            if start > now:
+                await asyncio.sleep(start - now)
+            try:
+                status, _, _ = await loop.run_in_executor(threads, self.pool.request, url, None, 'HEAD')
+                if status in (403, 405, 501):
+                    status, _, _ = await loop.run_in_executor(
+                        threads, functools.partial(self.pool.request, url, {'Range': 'bytes=0-0'}, 'GET',
+                                                   max_bytes=LINK_PROBE_BYTES, truncate=True))
+                result = {"ok": 200 <= status < 400, "status": status, "error": None}
+            except Exception as e:
+                result = {"ok": False, "status": None, "error": str(e) or type(e).__name__}
+        result["checked"] = time.time()
+        self.results[url] = result
+        self.checked += 1
+        return result
+
+    def save(self):
+        self.write(self.cache_path, json.dumps(self.results, ensure_ascii=False, indent=1,
+                                               sort_keys=True).encode('utf-8'))
@@ -0,0 +1,173 @@
+"""
+草莓知識百科的離線查詢
+
+以 normalize_data() 標準化後的項目建立記憶體索引 (分類、標籤鍵值、依糖度排序的陣列)，
+在腳本或命令列中做與網頁相同的篩選，不必逐筆掃描全部資料。
+
+    python strawberry_query.py --category 品種 --tag 來源=台灣 --tag 顏色=紅色 --sugar-min 14
+    python strawberry_query.py --tag 類型=真菌 --tag 類型=細菌     # 同一個鍵重複指定為「或」
+    python strawberry_query.py --category 品種 --facets            # 列出結果中各標籤的筆數
+    python strawberry_query.py --sugar-min 12 --json               # 輸出完整項目
+
+    from strawberry_query import load_index
+    index = load_index()
+    index.query(category="品種", tags={"來源": "台灣", "顏色": "紅色"}, sugar_min=14)
+"""
+import argparse
+import bisect
+import collections
+import importlib
+import json
+import os
+import sys
+
+kb = importlib.import_module('網頁生成v2')
+
+class KnowledgeIndex:
+    """
+    標準化項目的查詢索引
+    分類與標籤各自對應到項目位置的集合，糖度另存為排序後的陣列以二分搜尋取範圍。
+    查詢從候選數最少的條件開始做集合交集，糖度範圍較大時改為逐筆比對數值。
+    糖度 0 代表未知，不列入糖度索引，指定糖度範圍時不會出現在結果中。
+    """
+    def __init__(self, items):
+        self.items = list(items)
+        self.by_id = {}
+        self.by_category = {}   # 分類 -> 位置集合
+        self.by_tag = {}        # (標籤鍵, 標籤值) -> 位置集合
+        sugars = []
+        for position, item in enumerate(self.items):
+            self.by_id[item["id"]] = position
+            self.by_category.setdefault(item["category"], set()).add(position)
+            for key, value in item.get("tags", {}).items():
+                if value:
+                    self.by_tag.setdefault((key, value), set()).add(position)
+            if item.get("sugar"):
+                sugars.append((item["sugar"], position))
+        self.sugars = [item.get("sugar") or 0 for item in self.items]
+        sugars.sort()
+        self.sugar_values = [sugar for sugar, _ in sugars]
+        self.sugar_positions = [position for _, position in sugars]
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, item_id):
+        position = self.by_id.get(item_id)
+        return self.items[position] if position is not None else None
+
+    def sugar_range(self, low=None, high=None):
+        """糖度介於 low 與 high 之間 (含兩端) 的項目位置，依糖度由低到高排列"""
+        start = 0 if low is None else bisect.bisect_left(self.sugar_values, low)
+        stop = len(self.sugar_values) if high is None else bisect.bisect_right(self.sugar_values, high)
+        return self.sugar_positions[start:stop]
+
+    def _tag_set(self, key, values):
+        if isinstance(values, str):
+            values = (values,)
+        sets = [self.by_tag.get((key, value), set()) for value in values]
+        return sets[0] if len(sets) == 1 else set().union(*sets)
+
+    def select(self, category=None, tags=None, sugar_min=None, sugar_max=None):
+        """
+        符合所有條件的項目位置 (依原始順序)
+        tags 為 {標籤鍵: 值}，值可以是多個值的序列，表示其中任一個皆可
+        """
+        filters = []
+        if category is not None and category != "all":
+            filters.append(self.by_category.get(category, set()))
+        for key, values in (tags or {}).items():
+            filters.append(self._tag_set(key, values))
+        filters.sort(key=len)
+        check_sugar = sugar_min is not None or sugar_max is not None
+        in_range = self.sugar_range(sugar_min, sugar_max) if check_sugar else None
+
+        if filters and (in_range is None or len(filters[0]) < len(in_range)):
+            result = filters[0].intersection(*filters[1:])
+            if check_sugar:
+                # 標籤條件較少時先交集標籤，糖度直接比對數值
+                low = float('-inf') if sugar_min is None else sugar_min
+                high = float('inf') if sugar_max is None else sugar_max
+                sugars = self.sugars
+                result = [p for p in result if sugars[p] and low <= sugars[p] <= high]
+        elif filters:
+            result = filters[0].intersection(in_range, *filters[1:])
+        elif check_sugar:
+            result = in_range
+        else:
+            return list(range(len(self.items)))
+        return sorted(result)
+
+    def query(self, category=None, tags=None, sugar_min=None, sugar_max=None):
+        """符合所有條件的項目 (依原始順序)"""
+        return [self.items[p] for p in self.select(category, tags, sugar_min, sugar_max)]
+
+    def facets(self, positions=None):
+        """各 (標籤鍵, 標籤值) 在指定位置中的筆數，未指定時為全部項目"""
+        if positions is None:
+            return collections.Counter({tag: len(members) for tag, members in self.by_tag.items()})
+        positions = set(positions)
+        return collections.Counter({
+            tag: count for tag, members in self.by_tag.items()
+            if (count := len(members & positions))
+        })
+
+def load_index(filepaths=None):
+    """讀取資料檔 (預設為產生器使用的兩個 JSON) 並建立索引"""
+    if filepaths is None:
+        base_dir = os.path.dirname(os.path.abspath(kb.__file__))
+        filepaths = [os.path.join(base_dir, path) for path in (kb.VARIETIES_JSON, kb.DISEASE_JSON)]
+    data = {}
+    for filepath in filepaths:
+        for category, records in kb.load_data(filepath).items():
+            data.setdefault(category, []).extend(records)
+    return KnowledgeIndex(kb.normalize_data(data))
+
+def parse_tags(specs):
+    """['來源=台灣', '類型=真菌', '類型=細菌'] -> {'來源': ['台灣'], '類型': ['真菌', '細菌']}"""
+    tags = {}
+    for spec in specs:
+        key, sep, value = spec.partition('=')
+        if not sep or not key or not value:
+            raise ValueError(f"標籤條件格式應為 鍵=值: {spec}")
+        tags.setdefault(key, []).append(value)
+    return tags
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="查詢草莓知識百科資料")
+    parser.add_argument('--category', help="分類 (品種 / 病蟲害 / 缺素)")
+    parser.add_argument('--tag', action='append', default=[], metavar='KEY=VALUE',
+                        help="標籤條件，可重複指定；不同鍵為「且」，同一鍵為「或」")
+    parser.add_argument('--sugar-min', type=float, metavar='BRIX', help="最低糖度 (含)")
+    parser.add_argument('--sugar-max', type=float, metavar='BRIX', help="最高糖度 (含)")
+    parser.add_argument('--data-dir', metavar='DIR', help="改為讀取目錄下的所有 JSON 檔案")
+    parser.add_argument('--facets', action='store_true', help="列出結果中各標籤的筆數")
+    parser.add_argument('--json', action='store_true', help="以 JSON 輸出完整項目")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        tags = parse_tags(args.tag)
+    except ValueError as e:
+        print(f"錯誤: {e}")
+        return 2
+    index = load_index(kb.list_data_files(args.data_dir) if args.data_dir else None)
+    positions = index.select(args.category, tags, args.sugar_min, args.sugar_max)
+
+    if args.json:
+        json.dump([index.items[p] for p in positions], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    for p in positions:
+        item = index.items[p]
+        sugar = f" ({item['sugar']} Brix)" if item.get("sugar") else ""
+        print(f"[{item['category']}] {item['title']}{sugar}")
+    print(f"共 {len(positions)} 筆")
+    if args.facets:
+        for (key, value), count in sorted(index.facets(positions).items(), key=lambda x: (x[0][0], -x[1])):
+            print(f"  {key}={value}: {count}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
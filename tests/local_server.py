@@ -0,0 +1,84 @@
+"""
+測試用的本機 HTTP 伺服器
+以 http.server 在背景執行緒提供回應，路徑對應到處理函式，並記錄收到的每個請求。
+"""
+import http.server
+import os
+import sys
+import threading
+import time
+
+# 測試從 tests/ 匯入上層目錄的 strawberry_net 與產生器
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class Response:
+    def __init__(self, status=200, body=b'', headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+class LocalServer:
+    """
+    routes 為 {路徑: 函式(request) -> Response}，request 為 (方法, 路徑, 標頭 dict, 收到的時間)
+    未列出的路徑回應 404。以 keep-alive (HTTP/1.1) 回應，與實際的外部網站相同。
+    """
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                request = (self.command, self.path, dict(self.headers), time.monotonic())
+                with server._lock:
+                    server.requests.append(request)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    route = server.routes.get(self.path)
+                    response = route(request) if route else Response(404, b'not found')
+                finally:
+                    with server._lock:
+                        server.active -= 1
+                self.send_response(response.status)
+                for key, value in response.headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(response.body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    try:
+                        self.wfile.write(response.body)
+                    except ConnectionError:
+                        pass
+
+            do_GET = do_HEAD = _handle
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def requests_for(self, path):
+        return [r for r in self.requests if r[1] == path]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        if self._thread.is_alive():
+            self.httpd.shutdown()
+        self.httpd.server_close()
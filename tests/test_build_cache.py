@@ -0,0 +1,44 @@
+"""BuildCache 的輸出檢查與原子性寫檔失敗時的清理"""
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+kb = importlib.import_module('網頁生成v2')
+
+class BuildCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_missing_or_changed_output_is_not_intact(self):
+        page = self.path('page.html')
+        kb.atomic_write(page, b'<html></html>')
+        cache = kb.BuildCache(self.path('cache.json'))
+        cache.inputs_unchanged([], {})
+        cache.save('digest', {page: os.path.getsize(page)})
+        reloaded = kb.BuildCache(self.path('cache.json'))
+        self.assertTrue(reloaded.inputs_unchanged([], {}))
+        self.assertTrue(reloaded.outputs_intact())
+        kb.atomic_write(page, b'<html>changed</html>')
+        self.assertFalse(reloaded.outputs_intact())
+        os.remove(page)
+        self.assertFalse(reloaded.outputs_intact())
+
+    def test_failed_replace_removes_temp_file(self):
+        target = self.path('index.html')
+        os.mkdir(target)
+        with self.assertRaises(OSError):
+            kb.atomic_write(target, b'data')
+        self.assertEqual(sorted(os.listdir(self.dir)), ['index.html'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""DuplicateDetector: id 重複時的合併與改名"""
+import contextlib
+import importlib
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+kb = importlib.import_module('網頁生成v2')
+
+def variety(sugar, note=""):
+    return {"名稱": "苗栗1號 (戀香)", "糖度": sugar, "外形外觀": "果實呈卵形，顏色為紅色。" + note,
+            "tag": {"顏色": "紅色", "來源": "台灣"}}
+
+class DuplicateDetectorTest(unittest.TestCase):
+    def normalize(self, records):
+        detector = kb.DuplicateDetector()
+        with contextlib.redirect_stdout(io.StringIO()):
+            items = kb.normalize_data({"草莓品種": records}, detector)
+        return [item["id"] for item in items], detector
+
+    def test_identical_repeats_of_renamed_record_are_merged(self):
+        ids, detector = self.normalize([variety(15), variety(12), variety(13), variety(13)])
+        base = ids[0]
+        self.assertEqual(ids, [base, f"{base}_2", f"{base}_3"])
+        self.assertEqual((detector.merged, detector.renamed), (1, 2))
+        self.assertIn("合併 1 筆", detector.summary())
+
+    def test_repeat_of_first_record_is_merged(self):
+        ids, detector = self.normalize([variety(15), variety(12), variety(15), variety(12)])
+        self.assertEqual(len(ids), 2)
+        self.assertEqual((detector.merged, detector.renamed), (2, 1))
+
+    def test_renamed_id_does_not_clash_with_later_record(self):
+        ids, _ = self.normalize([variety(15), variety(12)])
+        records = [{"id": ids[0], "title": "a", "category": "品種"},
+                   {"id": ids[0], "title": "b", "category": "品種"},
+                   {"id": ids[1], "title": "c", "category": "品種"}]
+        detector = kb.DuplicateDetector()
+        with contextlib.redirect_stdout(io.StringIO()):
+            out = [detector.add(record)["id"] for record in records]
+        self.assertEqual(len(set(out)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
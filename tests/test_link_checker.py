@@ -0,0 +1,88 @@
+"""LinkChecker: HEAD 不支援時改用 GET、每個主機的速率與同時請求數限制、TTL 內沿用結果"""
+import os
+import tempfile
+import time
+import unittest
+
+from local_server import LocalServer, Response
+import strawberry_net
+
+def page(request):
+    return Response(200, b'ok')
+
+def no_head(request):
+    """不支援 HEAD，GET 時忽略 Range 回傳整個大檔案"""
+    if request[0] == 'HEAD':
+        return Response(405)
+    return Response(200, b'x' * (2 * 1024 * 1024))
+
+def slow(request):
+    time.sleep(0.2)
+    return Response(200, b'ok')
+
+class LinkCheckerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, 'links.json')
+        routes = {'/page': page, '/no-head': no_head}
+        routes.update({f'/slow/{i}': slow for i in range(6)})
+        routes.update({f'/page/{i}': page for i in range(6)})
+        self.server = LocalServer(routes).__enter__()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def check(self, paths, **kwargs):
+        checker = strawberry_net.LinkChecker(self.cache_path, **kwargs)
+        results = checker.check([self.server.url(p) for p in paths])
+        checker.save()
+        return checker, {url.split('/', 3)[3]: result for url, result in results.items()}
+
+    def test_head_falls_back_to_ranged_get(self):
+        _, results = self.check(['/page', '/no-head', '/missing'])
+        self.assertEqual((results['page']['ok'], results['page']['status']), (True, 200))
+        self.assertEqual((results['no-head']['ok'], results['no-head']['status']), (True, 200))
+        self.assertEqual((results['missing']['ok'], results['missing']['status']), (False, 404))
+        methods = [(r[0], r[2].get('Range')) for r in self.server.requests_for('/no-head')]
+        self.assertEqual(methods, [('HEAD', None), ('GET', 'bytes=0-0')])
+        self.assertEqual([r[0] for r in self.server.requests_for('/page')], ['HEAD'])
+
+    def test_probe_body_read_is_capped(self):
+        pool = strawberry_net._ConnectionPool()
+        try:
+            status, _, body = pool.request(self.server.url('/no-head'), max_bytes=16, truncate=True)
+            self.assertEqual((status, len(body)), (200, 16))
+            with self.assertRaises(ValueError):
+                pool.request(self.server.url('/no-head'), max_bytes=16)
+        finally:
+            pool.close()
+
+    def test_host_rate_limit(self):
+        self.check([f'/page/{i}' for i in range(6)], host_rate=20)
+        starts = sorted(r[3] for r in self.server.requests)
+        self.assertEqual(len(starts), 6)
+        # 每秒 20 個請求: 相鄰請求至少間隔 50 ms (保留計時誤差)
+        for earlier, later in zip(starts, starts[1:]):
+            self.assertGreaterEqual(later - earlier, 0.04)
+
+    def test_host_concurrency_limit(self):
+        _, results = self.check([f'/slow/{i}' for i in range(6)], host_concurrency=2, host_rate=1000)
+        self.assertTrue(all(result['ok'] for result in results.values()))
+        self.assertEqual(self.server.max_active, 2)
+
+    def test_ttl_reuse(self):
+        paths = ['/page', '/no-head']
+        self.check(paths)
+        count = len(self.server.requests)
+        checker, results = self.check(paths)
+        self.assertEqual((checker.cached, checker.checked), (2, 0))
+        self.assertEqual(len(self.server.requests), count)
+        self.assertTrue(results['page']['ok'])
+
+        checker, _ = self.check(paths, ttl=0)
+        self.assertEqual((checker.cached, checker.checked), (0, 2))
+        self.assertGreater(len(self.server.requests), count)
+
+if __name__ == '__main__':
+    unittest.main()
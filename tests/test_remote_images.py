@@ -0,0 +1,89 @@
+"""RemoteImageFetcher 的下載快取: 首次下載、max-age 內沿用、ETag 重新驗證、離線沿用與 404，以及下載後的縮圖排程"""
+import contextlib
+import importlib
+import io
+import os
+import tempfile
+import unittest
+
+from local_server import LocalServer, Response
+import strawberry_net
+
+kb = importlib.import_module('網頁生成v2')
+
+IMAGE = b'\x89PNG\r\n\x1a\n' + b'strawberry' * 100
+
+def image(request):
+    if request[2].get('If-None-Match') == '"v1"':
+        return Response(304)
+    return Response(200, IMAGE, {'ETag': '"v1"', 'Content-Type': 'image/png'})
+
+class RemoteImageFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.server = LocalServer({'/a.png': image}).__enter__()
+        self.url = self.server.url('/a.png')
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def fetch(self, url, **kwargs):
+        """以新的 RemoteImageFetcher (重新讀取快取索引) 下載一次，回傳 (本機路徑, fetcher)"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            with strawberry_net.RemoteImageFetcher(self.cache_dir, **kwargs) as fetcher:
+                path = fetcher.submit(url).result(timeout=10)
+        return path, fetcher
+
+    def test_first_download(self):
+        path, fetcher = self.fetch(self.url)
+        self.assertEqual(fetcher.downloaded, 1)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), IMAGE)
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, 'index.json')))
+
+    def test_max_age_hit_skips_request(self):
+        first, _ = self.fetch(self.url)
+        path, fetcher = self.fetch(self.url)
+        self.assertEqual(path, first)
+        self.assertEqual(fetcher.cached, 1)
+        self.assertEqual(len(self.server.requests_for('/a.png')), 1)
+
+    def test_etag_revalidation(self):
+        first, _ = self.fetch(self.url)
+        path, fetcher = self.fetch(self.url, max_age=0)
+        self.assertEqual(path, first)
+        self.assertEqual((fetcher.revalidated, fetcher.downloaded), (1, 0))
+        method, _, headers, _ = self.server.requests_for('/a.png')[-1]
+        self.assertEqual((method, headers.get('If-None-Match')), ('GET', '"v1"'))
+
+    def test_offline_uses_cache(self):
+        first, _ = self.fetch(self.url)
+        self.server.stop()
+        path, fetcher = self.fetch(self.url, max_age=0)
+        self.assertEqual(path, first)
+        self.assertEqual((fetcher.cached, fetcher.failed), (1, 0))
+
+    def test_offline_without_cache(self):
+        self.server.stop()
+        path, fetcher = self.fetch(self.url)
+        self.assertIsNone(path)
+        self.assertEqual(fetcher.failed, 1)
+
+    def test_not_found(self):
+        path, fetcher = self.fetch(self.server.url('/missing.png'))
+        self.assertIsNone(path)
+        self.assertEqual((fetcher.failed, fetcher.downloaded), (1, 0))
+
+    def test_optimizer_resolves_when_scheduling_fails(self):
+        """下載完成後無法送出縮圖工作 (行程池已關閉) 時結果為 None，不會永遠等待"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            with strawberry_net.RemoteImageFetcher(self.cache_dir) as fetcher:
+                optimizer = kb.ImageOptimizer(os.path.join(self.tmp.name, 'opt'), self.tmp.name,
+                                              jobs=1, fetcher=fetcher)
+                optimizer.executor.shutdown()
+                self.assertIsNone(optimizer.submit(self.url).result(timeout=10))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""strawberry_css: x-transition 屬性中的類別、ease-* 與 duration-* 覆寫 transition 預設值的順序"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import strawberry_css
+
+TEMPLATE = '''<div x-show="open"
+     x-transition:enter="transition ease-out duration-300"
+     x-transition:enter-start="opacity-0"
+     x-transition:leave="transition ease-in no-such-class"
+     class="p-4"></div>'''
+
+class StaticCssTest(unittest.TestCase):
+    def test_transition_attributes_are_declared(self):
+        names = strawberry_css.declared_classes(TEMPLATE)
+        self.assertTrue({"ease-out", "ease-in", "duration-300", "opacity-0", "no-such-class"} <= names)
+
+    def test_unsupported_transition_class_is_reported(self):
+        _, unsupported = strawberry_css.build_stylesheet(TEMPLATE)
+        self.assertEqual(unsupported, ["no-such-class"])
+
+    def test_overrides_follow_transition(self):
+        css, _ = strawberry_css.build_stylesheet(TEMPLATE)
+        lines = css.splitlines()
+        position = {name: next(i for i, line in enumerate(lines) if line.startswith(f".{name} "))
+                    for name in ("transition", "duration-300", "ease-out", "ease-in")}
+        self.assertLess(position["transition"], position["duration-300"])
+        self.assertLess(position["transition"], position["ease-out"])
+        self.assertIn("transition-timing-function: cubic-bezier(0, 0, 0.2, 1)", lines[position["ease-out"]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,48 @@
+import argparse
+import array
+import base64
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import gzip
+import hashlib
+import html
+import importlib.util
+import itertools
 import json
+import operator
 import os
+import re
+import struct
+import sys
+import time
+import tracemalloc
+import unicodedata
+import urllib.parse
+import zlib
+
+from strawberry_net import IMAGE_CACHE_DIR, LinkChecker, RemoteImageFetcher
 
 # 設定檔案路徑
 VARIETIES_JSON = 'strawberry_varieties.json'
 DISEASE_JSON = 'strawberry_disease.json'
 OUTPUT_HTML = 'strawberry_knowledge_base.html'
+BUILD_CACHE = '.build_cache.json'
+SHARD_DIR = 'strawberry_kb_data'
+IMAGE_OUTPUT_DIR = 'img/opt'
+PAGES_DIR = 'strawberry/kb'
+# 離線快取用的 service worker，與網頁放在同一目錄
+SERVICE_WORKER = 'strawberry_sw.js'
+
+# 虛擬化卡片網格: 篩選結果超過 threshold 筆時只掛載視窗附近的列，
+# 卡片固定為 cardHeight 高 (內容過長時於卡片內捲動)，gap 對應 Tailwind gap-6
+VIRTUAL_GRID = {"threshold": 120, "cardHeight": 620, "gap": 24, "overscan": 2}
+
+# 監看模式的輪詢間隔與去抖動時間 (秒)；只比對少數檔案的 stat，輪詢成本可忽略
+WATCH_INTERVAL = 0.02
+WATCH_DEBOUNCE = 0.02
+CACHE_VERSION = 3
 
 def load_data(filepath):
     """讀取 JSON 檔案"""
@@ -18,85 +56,1803 @@ def load_data(filepath):
         print(f"讀取 {filepath} 時發生錯誤: {e}")
         return {}
 
-def normalize_data(data):
+class DataReadError(Exception):
+    """輸入檔案不存在或無法解析；此時整個建置中止，不寫入任何輸出"""
+
+def iter_records(filepath, chunk_size=1 << 16):
     """
-    將不同類型的資料標準化為統一格式
+    逐筆讀取 JSON 檔案中各分類陣列的資料，產生 (分類, 索引, 資料)
+    檔案格式為 {"分類": [ {...}, {...} ], ...}，一次只解碼一筆資料，
+    記憶體用量只與單筆資料大小有關，與檔案大小無關。
+    解析錯誤可能出現在已產生部分資料之後，因此以 DataReadError 中止整個建置，
+    而不是只略過錯誤之後的資料。
     """
-    normalized_items = []
+    if not os.path.exists(filepath):
+        raise DataReadError(f"找不到檔案 {filepath}")
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield from _JsonStream(f, chunk_size).iter_arrays()
+    except (OSError, ValueError) as e:
+        raise DataReadError(f"讀取 {filepath} 時發生錯誤: {e}") from e
+
+class _JsonStream:
+    """以固定大小的區塊讀取檔案，並用 raw_decode 逐一解碼值"""
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """讀入下一個區塊，並丟棄已處理過的部分"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """略過空白並回傳下一個字元 (檔案結束時回傳空字串)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, chars):
+        ch = self._peek()
+        if ch == '' or ch not in chars:
+            raise ValueError(f"JSON 格式錯誤: 預期 {chars!r}，實際為 {ch!r}")
+        self.pos += 1
+        return ch
+
+    def _value(self):
+        """解碼下一個完整的 JSON 值，資料不足時繼續讀取"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # 數字等值可能剛好被區塊切斷，確認後面還有內容才算完整
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def iter_arrays(self):
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            category = self._value()
+            self._expect(':')
+            if self._peek() == '[':
+                self.pos += 1
+                index = 0
+                if self._peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield category, index, self._value()
+                        index += 1
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                # 非陣列的欄位直接略過
+                self._value()
+            if self._expect(',}') == '}':
+                return
+
+# --- 資料處理管線: 來源 -> 分類標準化 -> 驗證 -> 輸出 ---
+# 新增分類只需以 register_normalizer 註冊一個標準化函式，
+# 額外檢查以 register_validator 註冊，各階段皆為逐筆處理的產生器。
+
+NORMALIZERS = {}   # JSON 分類名稱 -> 標準化函式 (依註冊順序排列)
+VALIDATORS = []    # 檢查標準化後的項目，回傳錯誤訊息或 None
+
+def register_normalizer(category):
+    """註冊某個 JSON 分類的標準化函式"""
+    def decorator(func):
+        NORMALIZERS[category] = func
+        return func
+    return decorator
+
+def register_validator(func):
+    """註冊標準化後項目的驗證函式"""
+    VALIDATORS.append(func)
+    return func
+
+@register_normalizer("草莓品種")
+def normalize_variety(item):
+    """標準化單筆草莓品種資料"""
+    details = []
+    sugar_val = item.get("糖度", 0)
     
-    # 1. 處理草莓品種
-    for item in data.get("草莓品種", []):
-        details = []
-        sugar_val = item.get("糖度", 0)
-        
-        if item.get("外形外觀"):
-            details.append({"label": "外觀", "value": item["外形外觀"], "icon": "fa-regular fa-eye"})
-        if item.get("口味口感"):
-            details.append({"label": "口感", "value": item["口味口感"], "icon": "fa-solid fa-utensils"})
-        
-        if sugar_val > 0:
-            details.insert(0, {"label": "糖度", "value": f"約 {sugar_val} 度 (Brix)", "icon": "fa-solid fa-droplet"})
-
-        normalized_items.append({
-            "id": f"var_{item['名稱']}",
-            "category": "品種",
-            "title": item["名稱"],
-            "description": item.get("育苗簡介", "").replace('\n', '<br>'),
-            "tags": item.get("tag", {}), 
-            "sugar": sugar_val,
-            "images": item.get("img", []),
-            "details": details,
-            "sources": item.get("資料來源", []),
-            "icon_fallback": "fa-solid fa-seedling"
-        })
+    if item.get("外形外觀"):
+        details.append({"label": "外觀", "value": item["外形外觀"], "icon": "fa-regular fa-eye"})
+    if item.get("口味口感"):
+        details.append({"label": "口感", "value": item["口味口感"], "icon": "fa-solid fa-utensils"})
+    
+    if sugar_val > 0:
+        details.insert(0, {"label": "糖度", "value": f"約 {sugar_val} 度 (Brix)", "icon": "fa-solid fa-droplet"})
 
-    # 2. 處理病蟲害
-    for item in data.get("病蟲害", []):
-        details = []
-        if item.get("防治方法"):
-            details.append({"label": "防治重點", "value": item["防治方法"], "icon": "fa-solid fa-shield-virus"})
-
-        icon_class = "fa-solid fa-bug" if "蟲" in item.get("tag", {}).get("類型", "") else "fa-solid fa-bacteria"
-
-        normalized_items.append({
-            "id": f"pest_{item['名稱']}",
-            "category": "病蟲害",
-            "title": item["名稱"],
-            "description": item.get("症狀", "").replace('\n', '<br>'),
-            "tags": item.get("tag", {}),
-            "sugar": 0,
-            "images": item.get("img", []),
-            "details": details,
-            "sources": item.get("資料來源", []),
-            "icon_fallback": icon_class
-        })
+    return {
+        "id": f"var_{item['名稱']}",
+        "category": "品種",
+        "title": item["名稱"],
+        "description": item.get("育苗簡介", "").replace('\n', '<br>'),
+        "tags": item.get("tag", {}), 
+        "sugar": sugar_val,
+        "images": item.get("img", []),
+        "details": details,
+        "sources": item.get("資料來源", []),
+        "icon_fallback": "fa-solid fa-seedling"
+    }
+
+@register_normalizer("病蟲害")
+def normalize_pest(item):
+    """標準化單筆病蟲害資料"""
+    details = []
+    if item.get("防治方法"):
+        details.append({"label": "防治重點", "value": item["防治方法"], "icon": "fa-solid fa-shield-virus"})
+
+    icon_class = "fa-solid fa-bug" if "蟲" in item.get("tag", {}).get("類型", "") else "fa-solid fa-bacteria"
+
+    return {
+        "id": f"pest_{item['名稱']}",
+        "category": "病蟲害",
+        "title": item["名稱"],
+        "description": item.get("症狀", "").replace('\n', '<br>'),
+        "tags": item.get("tag", {}),
+        "sugar": 0,
+        "images": item.get("img", []),
+        "details": details,
+        "sources": item.get("資料來源", []),
+        "icon_fallback": icon_class
+    }
+
+@register_normalizer("缺素")
+def normalize_deficiency(item):
+    """標準化單筆缺素資料"""
+    details = []
+    if item.get("缺哪種元素"):
+        details.append({"label": "缺乏元素", "value": item["缺哪種元素"], "icon": "fa-solid fa-flask"})
+
+    return {
+        "id": f"def_{item['名稱']}",
+        "category": "缺素",
+        "title": item["名稱"],
+        "description": item.get("症狀", "").replace('\n', '<br>'),
+        "tags": {"元素": item.get("缺哪種元素", "未知")},
+        "sugar": 0,
+        "images": item.get("img", []),
+        "details": details,
+        "sources": item.get("資料來源", []),
+        "icon_fallback": "fa-solid fa-leaf"
+    }
+
+@register_validator
+def _check_title(item):
+    if not str(item.get("title", "")).strip():
+        return "名稱為空"
+    return None
+
+@register_validator
+def _check_lists(item):
+    for key in ("images", "sources", "details"):
+        if not isinstance(item.get(key), list):
+            return f"{key} 必須是陣列"
+    return None
+
+# --- 原始資料結構檢查 ---
+# 每個分類的欄位規格: type 為允許的型別，items 為陣列元素或字典值的型別，
+# required 缺少時整筆略過，warn_missing 缺少時只記錄警告 (例如糖度會被視為 0)
+_NUMBER = (int, float)
+
+RECORD_SCHEMAS = {
+    "草莓品種": {
+        "名稱": {"type": str, "required": True},
+        "糖度": {"type": _NUMBER, "warn_missing": True},
+        "育苗簡介": {"type": str},
+        "外形外觀": {"type": str},
+        "口味口感": {"type": str},
+        "tag": {"type": dict, "items": str},
+        "資料來源": {"type": list, "items": str},
+        "img": {"type": list, "items": str},
+    },
+    "病蟲害": {
+        "名稱": {"type": str, "required": True},
+        "症狀": {"type": str},
+        "防治方法": {"type": str},
+        "tag": {"type": dict, "items": str},
+        "資料來源": {"type": list, "items": str},
+        "img": {"type": list, "items": str},
+    },
+    "缺素": {
+        "名稱": {"type": str, "required": True},
+        "症狀": {"type": str},
+        "缺哪種元素": {"type": str, "warn_missing": True},
+        "資料來源": {"type": list, "items": str},
+        "img": {"type": list, "items": str},
+    },
+}
 
-    # 3. 處理缺素
-    for item in data.get("缺素", []):
-        details = []
-        if item.get("缺哪種元素"):
-            details.append({"label": "缺乏元素", "value": item["缺哪種元素"], "icon": "fa-solid fa-flask"})
-
-        normalized_items.append({
-            "id": f"def_{item['名稱']}",
-            "category": "缺素",
-            "title": item["名稱"],
-            "description": item.get("症狀", "").replace('\n', '<br>'),
-            "tags": {"元素": item.get("缺哪種元素", "未知")},
-            "sugar": 0,
-            "images": item.get("img", []),
-            "details": details,
-            "sources": item.get("資料來源", []),
-            "icon_fallback": "fa-solid fa-leaf"
+def _type_ok(value, types):
+    # bool 是 int 的子類別，數值欄位不接受 True/False
+    return isinstance(value, types) and not (isinstance(value, bool) and bool not in _as_tuple(types))
+
+def _as_tuple(types):
+    return types if isinstance(types, tuple) else (types,)
+
+def _compile_field(field, spec):
+    """將單一欄位規格編譯成檢查函式，回傳 (欄位, 訊息, 嚴重度) 或 None"""
+    types = spec["type"]
+    item_types = spec.get("items")
+    required = spec.get("required", False)
+    warn_missing = spec.get("warn_missing", False)
+    type_name = '/'.join(t.__name__ for t in _as_tuple(types))
+
+    def check(record):
+        value = record.get(field)
+        if value is None:
+            if required:
+                return field, "缺少必填欄位", "error"
+            if warn_missing:
+                return field, "缺少欄位，使用預設值", "warning"
+            return None
+        if not _type_ok(value, types):
+            return field, f"型別應為 {type_name}，實際為 {type(value).__name__}", "error"
+        if item_types is not None:
+            values = value.values() if isinstance(value, dict) else value
+            for v in values:
+                if not _type_ok(v, item_types):
+                    return field, f"內容型別應為 {item_types.__name__}，實際為 {type(v).__name__}", "error"
+        if required and isinstance(value, str) and not value.strip():
+            return field, "必填欄位為空", "error"
+        return None
+    return check
+
+def compile_schema(schema):
+    """將分類規格編譯成一個檢查函式，回傳該筆資料的問題清單"""
+    checks = [_compile_field(field, spec) for field, spec in schema.items()]
+
+    def check_record(record):
+        if not isinstance(record, dict):
+            return [(None, f"資料應為物件，實際為 {type(record).__name__}", "error")]
+        return [issue for issue in (check(record) for check in checks) if issue]
+    return check_record
+
+@functools.lru_cache(maxsize=None)
+def _schema_check(category):
+    schema = RECORD_SCHEMAS.get(category)
+    return compile_schema(schema) if schema is not None else None
+
+class ValidationReport:
+    """收集不合格資料 (檔案、索引、欄位)，可輸出成 JSON 供其他工具讀取"""
+    def __init__(self):
+        self.issues = []
+        self.skipped = 0
+
+    def add(self, filepath, category, index, field, message, severity="error"):
+        self.issues.append({
+            "file": filepath, "category": category, "index": index,
+            "field": field, "message": message, "severity": severity,
         })
 
-    return normalized_items
+    def merge(self, other):
+        self.issues.extend(other.issues)
+        self.skipped += other.skipped
+
+    def count(self, severity):
+        return sum(1 for issue in self.issues if issue["severity"] == severity)
+
+    def save(self, filepath):
+        data = {
+            "skipped": self.skipped,
+            "errors": self.count("error"),
+            "warnings": self.count("warning"),
+            "issues": self.issues,
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+def check_records(records, filepath, report):
+    """管線階段: 依分類規格檢查原始資料，有錯誤的資料記錄到 report 後略過"""
+    for category, index, record in records:
+        check = _schema_check(category)
+        issues = check(record) if check is not None else None
+        if issues:
+            has_error = False
+            for field, message, severity in issues:
+                report.add(filepath, category, index, field, message, severity)
+                has_error = has_error or severity == "error"
+            if has_error:
+                report.skipped += 1
+                continue
+        yield category, index, record
+
+def normalize_records(records):
+    """逐筆標準化 (分類, 索引, 資料) 串流，產生標準化後的項目"""
+    for category, _index, item in records:
+        normalizer = NORMALIZERS.get(category)
+        if normalizer is None:
+            continue
+        try:
+            normalized = normalizer(item)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            print(f"警告: 略過無法處理的{category}資料 #{_index}: {e!r}")
+            continue
+        yield normalized
+
+def validate_items(items):
+    """逐筆套用已註冊的驗證函式，不合格的項目印出警告後略過"""
+    for item in items:
+        errors = [msg for msg in (check(item) for check in VALIDATORS) if msg]
+        if errors:
+            print(f"警告: 略過 {item.get('id', '?')}: {'; '.join(errors)}")
+            continue
+        yield item
+
+def iter_sources(filepaths, report=None):
+    """依序串接多個 JSON 檔案的資料，提供 report 時先檢查資料結構"""
+    for filepath in filepaths:
+        records = iter_records(filepath)
+        if report is not None:
+            records = check_records(records, filepath, report)
+        yield from records
+
+def build_pipeline(records):
+    """組合各階段，回傳標準化且驗證過的項目產生器"""
+    return validate_items(normalize_records(records))
+
+# --- 重複資料檢查 ---
+# 名稱: 正規化後 (全半形、大小寫、空白與標點) 連同括號內的別名一起雜湊，
+# 例如「苗栗1號 (戀香)」與「戀香」會對到同一個鍵。
+# 描述: 以字元 3-gram 的 MinHash 簽章做 LSH 分桶，只比對落在同一桶的項目，
+# 不需兩兩比較。兩者都只在同一分類內比對。
+# 描述比對只產生報告中的警告，不影響輸出，成本又是重複檢查中最高的，只在輸出檢查報告時進行。
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+DESCRIPTION_SHINGLE = 3
+DESCRIPTION_MIN_CHARS = 20     # 描述過短時特徵太少，容易誤判，不列入比對
+DESCRIPTION_SIMILARITY = 0.8   # 簽章估計的 Jaccard 相似度達此值才視為重複
+LSH_BUCKET_LIMIT = 16          # 每個桶最多保留的項目數，避免大量相同描述退化成兩兩比較
+
+_MASK64 = (1 << 64) - 1
+_MINHASH_SIZE = MINHASH_BANDS * MINHASH_ROWS
+_MINHASH_SPAN = (1 << 64) // _MINHASH_SIZE
+_MINHASH_EMPTY = 1 << 64       # 大於任何雜湊值，代表空欄
+_ALIAS_RE = re.compile(r'\(([^()]*)\)')
+_TAG_RE = re.compile(r'<[^>]+>')
+_PUNCT_RE = re.compile(r'[\W_]+')
+
+def _normalize_text(text):
+    """統一全半形與大小寫，去除空白與標點"""
+    return _PUNCT_RE.sub('', unicodedata.normalize('NFKC', text).casefold())
+
+def name_keys(name):
+    """名稱與括號內別名的正規化雜湊，例如「苗栗1號 (戀香)」-> 苗栗1號、戀香"""
+    name = unicodedata.normalize('NFKC', name)
+    parts = [_ALIAS_RE.sub(' ', name)] + _ALIAS_RE.findall(name)
+    keys = []
+    for part in parts:
+        part = _normalize_text(part)
+        if part:
+            keys.append(hashlib.blake2b(part.encode('utf-8'), digest_size=8).digest())
+    return keys
+
+def minhash(text):
+    """
+    描述的 MinHash 簽章 (array('Q'))，描述過短時回傳 None
+    採用單次排列雜湊 (one permutation hashing): 每個 3-gram 只雜湊一次，
+    依雜湊值分到各欄取最小值，空欄以下一個非空欄補上，
+    成本與描述長度成正比，而不是長度乘以簽章長度。
+    """
+    text = _normalize_text(_TAG_RE.sub(' ', text))
+    if len(text) < DESCRIPTION_MIN_CHARS:
+        return None
+    data = text.encode('utf-32-le')
+    width = 4 * DESCRIPTION_SHINGLE
+    # crc32 比密碼學雜湊快數倍；先以集合去除重複的 3-gram，再乘上奇數常數把位元打散
+    slots = [_MINHASH_EMPTY] * _MINHASH_SIZE
+    for h in {zlib.crc32(data[i:i + width]) for i in range(0, len(data) - width + 4, 4)}:
+        h = (h * 0x9E3779B97F4A7C15) & _MASK64
+        slot = h % _MINHASH_SIZE
+        if h < slots[slot]:
+            slots[slot] = h
+    filled = slots[:]
+    for i, h in enumerate(slots):
+        if h == _MINHASH_EMPTY:
+            j = i + 1
+            while slots[j % _MINHASH_SIZE] == _MINHASH_EMPTY:
+                j += 1
+            # 空欄補上時加上距離 (除以欄數後為 距離 * _MINHASH_SPAN)，讓補上的值與原欄位的值不會互相撞在一起
+            filled[i] = slots[j % _MINHASH_SIZE] + ((j - i) << 64)
+    return array.array('Q', [h // _MINHASH_SIZE for h in filled])
+
+def _similarity(a, b):
+    return sum(map(operator.eq, a, b)) / len(a)
+
+class DuplicateDetector:
+    """
+    逐筆檢查重複的項目
+    - id 相同且內容完全相同: 視為同一筆，保留第一筆
+    - id 相同但內容不同: 後者的 id 加上序號，確保網頁中的 :key 唯一
+    - 名稱或別名相同、描述高度相似 (descriptions 為 True 時才比對描述): 記錄為疑似重複，照常輸出
+    簽章只存一份，LSH 桶中記錄簽章的位置；簽章片段以 bytes 作為桶的鍵。
+    """
+    def __init__(self, descriptions=False):
+        self.descriptions = descriptions
+        self.ids = set()         # 已輸出的 id (含改名後的 id)
+        self.originals = {}      # 原始 id -> [(原始項目, 輸出的 id)]，只在 id 重複時比對內容
+        self.names = {}          # (分類, 名稱雜湊) -> 第一個使用該名稱的 id
+        self.signatures = []     # [(id, 簽章)]
+        self.buckets = {}        # 分類 -> 每段一個 {簽章片段: [簽章位置]}
+        self.duplicates = {}     # (先出現的 id, 後出現的 id) -> 原因與相似度
+        self.merged = 0
+        self.renamed = 0
+
+    def _unique_id(self, item_id):
+        n = 2
+        while f"{item_id}_{n}" in self.ids:
+            n += 1
+        return f"{item_id}_{n}"
+
+    def _flag(self, category, first, second, reason, similarity=None):
+        entry = self.duplicates.setdefault(
+            (first, second), {"category": category, "reasons": [], "similarity": None})
+        if reason not in entry["reasons"]:
+            entry["reasons"].append(reason)
+        if similarity is not None:
+            entry["similarity"] = similarity
+
+    def add(self, item):
+        """檢查單筆項目，回傳要輸出的項目 (id 可能已改名)，與先前同 id 的某筆完全相同時回傳 None"""
+        item_id = item["id"]
+        seen = self.originals.setdefault(item_id, [])
+        if item_id in self.ids:
+            # id 重複時才比對內容；與任何一筆同 id 的項目 (包含已改名的) 相同都視為同一筆
+            if any(original == item for original, _ in seen):
+                self.merged += 1
+                return None
+            new_id = self._unique_id(item_id)
+            print(f"警告: id 重複 {item_id}，內容不同，改為 {new_id}")
+            self._flag(item["category"], item_id, new_id, "id")
+            seen.append((item, new_id))
+            item = dict(item, id=new_id)
+            self.renamed += 1
+            item_id = new_id
+        else:
+            seen.append((item, item_id))
+        self.ids.add(item_id)
+
+        category = item["category"]
+        for key in name_keys(item["title"]):
+            first = self.names.setdefault((category, key), item_id)
+            if first != item_id:
+                self._flag(category, first, item_id, "name")
+
+        signature = minhash(item.get("description", "")) if self.descriptions else None
+        if signature is not None:
+            position = len(self.signatures)
+            self.signatures.append((item_id, signature))
+            packed = signature.tobytes()
+            width = MINHASH_ROWS * signature.itemsize
+            bands = self.buckets.get(category)
+            if bands is None:
+                bands = self.buckets[category] = [{} for _ in range(MINHASH_BANDS)]
+            seen = set()
+            for band, buckets in enumerate(bands):
+                bucket = buckets.setdefault(packed[band * width:(band + 1) * width], [])
+                for other in bucket:
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    other_id, other_signature = self.signatures[other]
+                    similarity = _similarity(signature, other_signature)
+                    if similarity >= DESCRIPTION_SIMILARITY:
+                        self._flag(category, other_id, item_id, "description", similarity)
+                if len(bucket) < LSH_BUCKET_LIMIT:
+                    bucket.append(position)
+        return item
+
+    def report_to(self, report):
+        """將疑似重複加入檢查報告 (警告)"""
+        for (first, second), entry in self.duplicates.items():
+            message = f"{second} 與 {first} 疑似重複 ({'、'.join(entry['reasons'])})"
+            if entry["similarity"] is not None:
+                message += f"，描述相似度 {entry['similarity']:.2f}"
+            report.add(None, entry["category"], None, "id", message, "warning")
+
+    def summary(self, limit=10):
+        lines = [f"重複檢查: 合併 {self.merged} 筆完全相同的資料，"
+                 f"重新命名 {self.renamed} 個重複 id，{len(self.duplicates)} 組疑似重複"]
+        for (first, second), entry in list(self.duplicates.items())[:limit]:
+            lines.append(f"  {first} <-> {second} ({'、'.join(entry['reasons'])})")
+        if len(self.duplicates) > limit:
+            lines.append(f"  ... 其餘 {len(self.duplicates) - limit} 組請以 --report 輸出")
+        return '\n'.join(lines)
+
+def dedupe_items(items, detector):
+    """管線階段: 合併完全相同的項目、確保 id 唯一，並記錄疑似重複"""
+    for item in items:
+        item = detector.add(item)
+        if item is not None:
+            yield item
+
+def _load_file(filepath):
+    """(子行程) 讀取、檢查並標準化單一檔案，回傳項目清單與檢查報告"""
+    report = ValidationReport()
+    items = list(build_pipeline(iter_sources([filepath], report)))
+    return items, report
+
+def iter_parallel(filepaths, jobs=None, report=None):
+    """
+    以行程池同時處理多個檔案，依檔案順序合併結果，
+    項目順序與 id 與逐一處理時完全相同；行程數不超過檔案數
+    """
+    filepaths = list(filepaths)
+    workers = min(jobs or os.cpu_count() or 1, len(filepaths))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for items, file_report in executor.map(_load_file, filepaths):
+            if report is not None:
+                report.merge(file_report)
+            yield from items
+
+class SourceCache:
+    """
+    監看模式: 在記憶體中保留每個輸入檔標準化後的項目與檢查報告，
+    以檔案的修改時間與大小判斷是否變動，重新建置時只重新讀取、標準化有變動的檔案。
+    項目在之後的階段不會被修改 (改名、最佳化圖片都會複製)，可以直接重複使用。
+    """
+    def __init__(self):
+        self.files = {}          # 路徑 -> ((修改時間, 大小), 項目清單, 檢查報告)
+        self.reloaded = []
+
+    def iter_items(self, filepaths, report=None):
+        for path in set(self.files) - set(filepaths):
+            del self.files[path]
+        self.reloaded = []
+        for path in filepaths:
+            try:
+                stat = os.stat(path)
+                key = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                key = None
+            entry = self.files.get(path)
+            if entry is None or key is None or entry[0] != key:
+                self.files.pop(path, None)
+                entry = (key, *_load_file(path))
+                self.files[path] = entry
+                self.reloaded.append(path)
+            if report is not None:
+                report.merge(entry[2])
+            yield from entry[1]
+
+def list_data_files(data_dir):
+    """資料目錄下的所有 JSON 檔案，依檔名排序以確保合併順序固定"""
+    return sorted(
+        os.path.join(data_dir, name) for name in os.listdir(data_dir)
+        if name.lower().endswith('.json')
+    )
+
+def normalize_data(data, detector=None):
+    """
+    將不同類型的資料標準化為統一格式，並合併重複的項目
+    """
+    records = (
+        (category, index, item)
+        for category in NORMALIZERS
+        for index, item in enumerate(data.get(category, []))
+    )
+    return list(dedupe_items(build_pipeline(records), detector or DuplicateDetector()))
+
+class BuildCache:
+    """
+    增量建置快取
+    記錄上次建置的輸入檔案雜湊、建置選項、輸出網頁的雜湊與所有輸出檔的大小，
+    輸入與選項都沒有變動、輸出檔也都還在時不必解析資料即可略過整個建置。
+    只在整個建置 (含單頁、預先壓縮) 完成後才記錄，建置中途失敗時下次會完整重建。
+    產生器程式本身有變動時整份快取作廢。
+    (逐筆快取標準化結果的成本比標準化本身還高，因此不做逐筆快取)
+    """
+    def __init__(self, path):
+        self.path = path
+        self.output_hash = None
+        self.inputs = {}
+        self.outputs = {}        # 輸出檔路徑 -> 大小
+        self._inputs = {}
+        self.generator_hash = _file_digest(__file__)
+        self.autosave = True
+        if path is not None:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"讀取快取 {self.path} 時發生錯誤，將完整重建: {e}")
+            return
+        if data.get("version") != CACHE_VERSION or data.get("generator") != self.generator_hash:
+            return
+        self.output_hash = data.get("output")
+        self.inputs = data.get("inputs", {})
+        self.outputs = data.get("outputs", {})
+
+    def inputs_unchanged(self, filepaths, options=None):
+        """輸入檔案與建置選項皆與上次相同 (不需解析即可判斷)"""
+        self._inputs = {
+            path: _file_digest(path) for path in filepaths if os.path.exists(path)
+        }
+        self._inputs["__options__"] = options or {}
+        return self.output_hash is not None and self._inputs == self.inputs
+
+    def outputs_intact(self):
+        """上次建置的輸出檔 (網頁、分片、單頁與它們的紀錄檔) 都還在且大小相同"""
+        for path, size in self.outputs.items():
+            try:
+                if os.path.getsize(path) != size:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def save(self, output_hash, outputs=None):
+        """
+        記錄本次建置的輸入與輸出，outputs 為 {輸出檔路徑: 大小}，None 時沿用上次的紀錄
+        autosave 為 False 時 (監看模式) 只更新記憶體中的快取，由 write() 另外寫檔
+        """
+        self.inputs = self._inputs
+        self.output_hash = output_hash
+        if outputs is not None:
+            self.outputs = outputs
+        if self.autosave:
+            self.write()
+
+    def write(self):
+        """將快取寫入檔案"""
+        data = {
+            "version": CACHE_VERSION,
+            "generator": self.generator_hash,
+            "output": self.output_hash,
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+        }
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+# --- 原子性寫檔: 暫存檔 + fsync + rename，內容相同時不覆寫 ---
+
+def _tmp_path(filepath):
+    return f"{filepath}.{os.getpid()}.tmp"
+
+def _fsync_dir(dirpath):
+    """確保 rename 本身也寫入磁碟 (Windows 不支援對目錄 fsync)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(dirpath or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _same_content(filepath, size, digest):
+    """現有檔案的內容是否與指定的大小與雜湊相同"""
+    try:
+        if os.path.getsize(filepath) != size:
+            return False
+    except OSError:
+        return False
+    return _file_digest(filepath) == digest
+
+def _commit_tmp(tmp_path, filepath, size, digest):
+    """
+    將已 fsync 的暫存檔替換為目標檔；內容與現有檔案相同時捨棄暫存檔，
+    以保留原本的修改時間 (避免 CDN 與瀏覽器快取失效)。回傳是否寫入。
+    """
+    if _same_content(filepath, size, digest):
+        os.remove(tmp_path)
+        return False
+    try:
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _fsync_dir(os.path.dirname(filepath))
+    return True
+
+def _write_tmp(filepath, data):
+    """將 bytes 寫入目標檔旁的暫存檔並 fsync，回傳暫存檔路徑"""
+    tmp_path = _tmp_path(filepath)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+def atomic_write(filepath, data):
+    """原子性寫入 bytes，回傳 (雜湊, 是否寫入)"""
+    digest = hashlib.sha256(data).hexdigest()
+    # 內容相同時連暫存檔都不必寫
+    if _same_content(filepath, len(data), digest):
+        return digest, False
+    return digest, _commit_tmp(_write_tmp(filepath, data), filepath, len(data), digest)
+
+def stage_write(filepath, data):
+    """
+    先將 bytes 寫入暫存檔，等整個建置成功後再以 commit_staged() 替換目標檔
+    內容與現有檔案相同時不寫入，回傳 None；否則回傳 (暫存檔, 目標檔, 大小, 雜湊)
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if _same_content(filepath, len(data), digest):
+        return None
+    return _write_tmp(filepath, data), filepath, len(data), digest
+
+def commit_staged(staged):
+    """替換所有暫存的檔案"""
+    for entry in staged:
+        _commit_tmp(*entry)
+    staged.clear()
+
+def discard_staged(staged):
+    """建置失敗時刪除所有暫存檔，目標檔維持原狀"""
+    for tmp_path, *_ in staged:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+    staged.clear()
+
+def write_digest_file(filepath, digest):
+    """輸出 sha256sum 格式的雜湊檔 (<檔名>.sha256)，供部署時設定 ETag 等快取標頭"""
+    line = f"{digest}  {os.path.basename(filepath)}\n"
+    atomic_write(filepath + '.sha256', line.encode('utf-8'))
+
+def _file_digest(filepath):
+    """計算檔案內容的 SHA-256"""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+# --- 圖片最佳化: 產生卡片縮圖與燈箱用的 WebP 版本 ---
+
+# 卡片圖片框高 192px，縮圖提供 1x / 2x 寬度；燈箱使用較大的版本
+THUMB_WIDTHS = (320, 640)
+LIGHTBOX_WIDTH = 1600
+# 指向本 repo 的 raw.githubusercontent.com 圖片可直接對應到本機檔案
+REPO_RAW_PREFIXES = (
+    'https://raw.githubusercontent.com/XPRAMT/xpramt.github.io/refs/heads/main/',
+    'https://raw.githubusercontent.com/XPRAMT/xpramt.github.io/main/',
+)
+
+def resolve_local_image(src, base_dir='.'):
+    """將 items 中的圖片位置對應到本機檔案，無法對應 (外部網址) 時回傳 None"""
+    for prefix in REPO_RAW_PREFIXES:
+        if src.startswith(prefix):
+            src = urllib.parse.unquote(src[len(prefix):])
+            break
+    else:
+        if '://' in src:
+            return None
+    path = os.path.join(base_dir, src)
+    return path if os.path.isfile(path) else None
+
+# --- 連結檢查: 資料來源與圖片網址 (連線與快取見 strawberry_net) ---
+
+def collect_links(items):
+    """整理項目中的所有網址: {網址: [(項目 id, 欄位), ...]}，本機圖片路徑不列入"""
+    links = {}
+    for item in items:
+        for field in ("sources", "images"):
+            for url in item.get(field, []):
+                if isinstance(url, str) and '://' in url:
+                    links.setdefault(url, []).append((item["id"], field))
+    return links
+
+def _resize_image(src_path, variants):
+    """
+    (子行程) 解碼一次來源圖片，依序輸出各寬度的 WebP
+    variants 為 [(寬度, 輸出路徑), ...]，由大到小排列
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ('RGB', 'RGBA'):
+            im = im.convert('RGBA' if 'A' in im.getbands() else 'RGB')
+        for width, out_path in variants:
+            if im.width > width:
+                im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+            tmp_path = out_path + '.tmp'
+            im.save(tmp_path, 'WEBP', quality=80, method=6)
+            os.replace(tmp_path, out_path)
+    return src_path
+
+class ImageOptimizer:
+    """
+    以行程池平行產生縮圖。輸出檔名以來源內容雜湊命名 (img/opt/<雜湊>-<寬>.webp)，
+    已存在的版本直接沿用，同一張圖片在整次建置中只處理一次。
+    提供 fetcher (RemoteImageFetcher) 時，外部網址的圖片先下載到本機快取再處理。
+    """
+    def __init__(self, output_dir, base_dir='.', jobs=None, fetcher=None):
+        self.output_dir = output_dir
+        self.base_dir = base_dir
+        self.fetcher = fetcher
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        self.created = 0
+        self.reused = 0
+        self._futures = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown()
+
+    def submit(self, src):
+        """回傳 Future，結果為 {寬度: 網址} 或 None (無法處理的圖片)"""
+        future = self._futures.get(src)
+        if future is None:
+            future = self._futures[src] = self._schedule(src)
+        return future
+
+    def _schedule(self, src):
+        path = resolve_local_image(src, self.base_dir)
+        if path is None and self.fetcher is not None and src.startswith(('http://', 'https://')):
+            done = concurrent.futures.Future()
+
+            def scheduled(f):
+                if f.exception() is not None:
+                    print(f"警告: 無法處理圖片 {src}: {f.exception()}")
+                    done.set_result(None)
+                else:
+                    f.result().add_done_callback(lambda r: done.set_result(r.result()))
+
+            def fetched(f):
+                path = f.result() if f.exception() is None else None
+                if path is None:
+                    done.set_result(None)
+                    return
+                # 回呼在下載用的事件迴圈執行緒上執行: 雜湊檔案與送出工作改由執行緒池處理，
+                # 其中的例外 (例如行程池已損壞) 也經由 scheduled 讓 done 有結果
+                self.fetcher.threads.submit(self._schedule_path, src, path).add_done_callback(scheduled)
+            self.fetcher.submit(src).add_done_callback(fetched)
+            return done
+        return self._schedule_path(src, path)
+
+    def _schedule_path(self, src, path):
+        done = concurrent.futures.Future()
+        if path is None:
+            done.set_result(None)
+            return done
+        digest = _file_digest(path)[:16]
+        widths = sorted({*THUMB_WIDTHS, LIGHTBOX_WIDTH}, reverse=True)
+        variants = [(w, os.path.join(self.output_dir, f"{digest}-{w}.webp")) for w in widths]
+        urls = {w: os.path.relpath(out, self.base_dir).replace(os.sep, '/') for w, out in variants}
+        missing = [(w, out) for w, out in variants if not os.path.exists(out)]
+        if not missing:
+            self.reused += 1
+            done.set_result(urls)
+            return done
+        os.makedirs(self.output_dir, exist_ok=True)
+        # 縮小必須從較大的版本開始，因此缺任何一個就整組重新產生
+        future = self.executor.submit(_resize_image, path, variants)
+
+        def finish(f):
+            if f.exception() is not None:
+                print(f"警告: 無法處理圖片 {src}: {f.exception()}")
+                done.set_result(None)
+            else:
+                self.created += 1
+                done.set_result(urls)
+        future.add_done_callback(finish)
+        return done
+
+    def thumbnails(self):
+        """已產生的縮圖網址 (依名稱排序)，供 service worker 預先快取"""
+        urls = set()
+        for future in self._futures.values():
+            if future.done() and future.result():
+                urls.update(future.result()[w] for w in THUMB_WIDTHS)
+        return sorted(urls)
+
+def optimize_item_images(items, optimizer, window=32):
+    """
+    管線階段: 為每個項目的圖片加上 thumbs (src + srcset)，images 改指向燈箱版本
+    預先送出後面 window 筆的工作，輸出順序與輸入相同
+    """
+    pending = collections.deque()
+
+    def apply(item, futures):
+        results = [f.result() for f in futures]
+        if not any(results):
+            return item
+        item = dict(item)
+        item["images"] = [urls[LIGHTBOX_WIDTH] if urls else src
+                          for src, urls in zip(item["images"], results)]
+        item["thumbs"] = [
+            {"src": urls[THUMB_WIDTHS[0]],
+             "srcset": ', '.join(f"{urls[w]} {w}w" for w in THUMB_WIDTHS)} if urls else None
+            for urls in results
+        ]
+        return item
+
+    for item in items:
+        pending.append((item, [optimizer.submit(src) for src in item.get("images", [])]))
+        if len(pending) >= window:
+            yield apply(*pending.popleft())
+    while pending:
+        yield apply(*pending.popleft())
+
+# --- 靜態單頁: 每個項目一個不需 JavaScript 的介紹頁 ---
+
+PAGE_CATEGORY_TITLES = {"品種": "草莓品種介紹", "病蟲害": "病蟲害防治", "缺素": "營養缺素"}
+
+def page_filename(item):
+    """由項目 id 產生可用於各作業系統的檔名"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', item["id"]).strip('_') + '.html'
+
+def _page_url(src, root):
+    """資料中的相對路徑是以網站根目錄為準，換算成從單頁所在目錄的路徑"""
+    if '://' in src or src.startswith('/'):
+        return src
+    return root + src
+
+def render_item_page(item, root='../../'):
+    """產生單一項目的靜態 HTML (描述欄位與網頁版相同，視為可信任的 HTML)"""
+    esc = html.escape
+    title = esc(item["title"])
+    tags = ''.join(
+        f'<li><strong>{esc(str(k))}:</strong> {esc(str(v))}</li>' for k, v in item.get("tags", {}).items() if v
+    )
+    details = ''.join(
+        f'<p><strong>{esc(d["label"])}：</strong> {esc(str(d["value"]))}</p>' for d in item.get("details", [])
+    )
+    images = ''.join(
+        f'<img src="{esc(_page_url(src, root))}" alt="{title}" loading="lazy">' for src in item.get("images", [])
+    )
+    sources = ''.join(
+        f'<li><a href="{esc(url)}" target="_blank" rel="noopener">{esc(url)}</a></li>' for url in item.get("sources", [])
+    )
+    return f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{esc(item["category"])} - {title}</title>
+    <link rel="stylesheet" href="{root}css/style.css">
+</head>
+<body>
+
+    <header class="site-header">
+        <div class="header-container">
+            <h1 class="site-title"><a href="{root}index.html" style="text-decoration: none; color: inherit;">XPRAMT</a></h1>
+            <nav class="main-nav">
+                <ul>
+                    <li><a href="{root}index.html#projects" class="nav-tab">專案</a></li>
+                    <li><a href="{root}index.html#articles" class="nav-tab">文章</a></li>
+                    <li><a href="index.html" class="nav-tab active">草莓</a></li>
+                    <li><a href="{root}index.html#about" class="nav-tab">關於我</a></li>
+                </ul>
+            </nav>
+        </div>
+    </header>
+
+    <main class="site-main">
+        <section class="content-section active">
+            <h2>{esc(PAGE_CATEGORY_TITLES.get(item["category"], item["category"]))}</h2>
+
+            <div class="info-grid">
+                <div class="card info-card">
+                    <h4>{title}</h4>
+                    {f'<div class="image-gallery">{images}</div>' if images else ''}
+                    {f'<ul>{tags}</ul>' if tags else ''}
+                    <p>{item.get("description", "")}</p>
+                    {details}
+                    {f'<p><strong>參考資料來源：</strong></p><ul>{sources}</ul>' if sources else ''}
+                    <p><a href="{root}{OUTPUT_HTML}">返回草莓知識百科</a></p>
+                </div>
+            </div>
+        </section>
+    </main>
+
+    <footer class="site-footer">
+        <p>&copy; 2025 By XPRAMT</p>
+    </footer>
+</body>
+</html>
+"""
+
+def _render_page_file(item, filepath):
+    """(子行程) 產生單一頁面並寫入暫存檔，回傳 stage_write() 的結果"""
+    return stage_write(filepath, render_item_page(item).encode('utf-8'))
+
+class PageBuilder:
+    """
+    以行程池平行產生每個項目的靜態頁面
+    記錄每頁對應的項目雜湊 (.pages.json)，只重新產生內容有變動的頁面，
+    並移除已不存在項目的頁面。
+    """
+    MANIFEST = '.pages.json'
+
+    def __init__(self, output_dir, jobs=None, window=256):
+        self.output_dir = output_dir
+        self.window = window
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        self.generator_hash = _file_digest(__file__)
+        self.previous = self._load_manifest()
+        self.current = {}
+        self.entries = []
+        self.rendered = 0
+        self.reused = 0
+        self._pending = collections.deque()
+        self._staged = []
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return self
+
+    def __exit__(self, *exc):
+        failed = exc[0] is not None
+        self.executor.shutdown(cancel_futures=failed)
+        if failed:
+            # 建置中止: 已完成的頁面也只留在暫存檔，一併刪除
+            for future in self._pending:
+                if not future.cancelled() and future.exception() is None and future.result():
+                    self._staged.append(future.result())
+            discard_staged(self._staged)
+
+    def _load_manifest(self):
+        path = os.path.join(self.output_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"讀取 {path} 時發生錯誤，將重新產生所有頁面: {e}")
+            return {}
+
+    def add(self, item):
+        filename = page_filename(item)
+        if filename in self.current:
+            print(f"警告: 頁面檔名重複，略過 {item['id']}")
+            return
+        payload = json.dumps([self.generator_hash, item], ensure_ascii=False, sort_keys=True)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        self.current[filename] = digest
+        self.entries.append((item["category"], item["title"], filename))
+        filepath = os.path.join(self.output_dir, filename)
+        if self.previous.get(filename) == digest and os.path.exists(filepath):
+            self.reused += 1
+            return
+        self._pending.append(self.executor.submit(_render_page_file, item, filepath))
+        if len(self._pending) >= self.window:
+            self._collect(self._pending.popleft())
+
+    def _collect(self, future):
+        staged = future.result()
+        if staged is not None:
+            self._staged.append(staged)
+        self.rendered += 1
+
+    def finish(self):
+        """等待所有頁面完成，輸出索引頁與紀錄檔，並移除過期頁面"""
+        while self._pending:
+            self._collect(self._pending.popleft())
+        commit_staged(self._staged)
+        for filename in set(self.previous) - set(self.current):
+            _remove_with_siblings(os.path.join(self.output_dir, filename))
+        atomic_write(os.path.join(self.output_dir, 'index.html'), self._render_index().encode('utf-8'))
+        atomic_write(os.path.join(self.output_dir, self.MANIFEST),
+                     json.dumps(self.current, ensure_ascii=False, indent=0).encode('utf-8'))
+
+    def paths(self):
+        """本次建置所有頁面的路徑 (含索引頁)"""
+        return [os.path.join(self.output_dir, name) for name in [*self.current, 'index.html']]
+
+    def _render_index(self, root='../../'):
+        esc = html.escape
+        groups = {}
+        for category, title, filename in self.entries:
+            groups.setdefault(category, []).append(
+                f'<li><a href="{esc(urllib.parse.quote(filename))}">{esc(title)}</a></li>')
+        sections = ''.join(
+            f'<h2>{esc(PAGE_CATEGORY_TITLES.get(category, category))}</h2><ul>{"".join(links)}</ul>'
+            for category, links in groups.items()
+        )
+        return f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>草莓知識百科 - 全部項目</title>
+    <link rel="stylesheet" href="{root}css/style.css">
+</head>
+<body>
+    <main class="site-main">
+        <section class="content-section active">
+            {sections}
+        </section>
+    </main>
+</body>
+</html>
+"""
+
+def build_item_pages(items, builder):
+    """管線階段: 將經過的項目交給 PageBuilder，項目本身原樣傳遞"""
+    for item in items:
+        builder.add(item)
+        yield item
+
+# 預先壓縮的檔案副檔名，靜態主機 (如 nginx gzip_static / brotli_static) 可直接回傳
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+def _remove_with_siblings(path):
+    """刪除檔案以及它的預先壓縮版本"""
+    for target in (path, *(path + suffix for suffix in COMPRESSED_SUFFIXES)):
+        if os.path.exists(target):
+            os.remove(target)
+
+# 記錄各類輸出檔 本次 / 上一次 建置的檔名，用來判斷哪些舊檔可以刪除
+GENERATIONS_FILE = '.generations.json'
+
+def prune_generations(output_dir, kind, pattern, current):
+    """
+    保留本次與上一次建置的檔案，刪除更早的檔案 (檔名符合 pattern 者)
+    檔名含內容雜湊，新檔不會覆寫舊網頁使用中的檔案；仍快取著上一版網頁的瀏覽器
+    (主機的 max-age、開著的分頁、service worker) 還能載入對應的檔案，再下一次建置才刪除。
+    """
+    if not os.path.isdir(output_dir):
+        return
+    path = os.path.join(output_dir, GENERATIONS_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    entry = {"current": sorted(set(current)), "previous": state.get(kind, {}).get("current", [])}
+    keep = set(entry["current"]) | set(entry["previous"])
+    for name in os.listdir(output_dir):
+        if pattern.fullmatch(name) and name not in keep:
+            _remove_with_siblings(os.path.join(output_dir, name))
+    state[kind] = entry
+    atomic_write(path, json.dumps(state, ensure_ascii=False, indent=1, sort_keys=True).encode('utf-8'))
+
+def _drop_stale_siblings(path):
+    """未啟用預先壓縮時，刪除比原檔舊的壓縮版本，避免主機回傳過期內容"""
+    for suffix in COMPRESSED_SUFFIXES:
+        sibling = path + suffix
+        if os.path.exists(sibling) and os.path.getmtime(sibling) < os.path.getmtime(path):
+            os.remove(sibling)
+
+def _compress_file(path, suffixes):
+    """在子行程中以最高壓縮等級產生 .gz / .br，回傳各格式的大小"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {}
+    for suffix in suffixes:
+        if suffix == '.gz':
+            # mtime 固定為 0，內容相同時輸出也相同
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            import brotli
+            compressed = brotli.compress(data, quality=11)
+        atomic_write(path + suffix, compressed)
+        sizes[suffix] = len(compressed)
+    return sizes
+
+class Precompressor:
+    """
+    以行程池平行為產生的檔案建立壓縮版本
+    壓縮檔比原檔新時視為有效直接沿用 (原檔內容未變時 atomic_write 不會更新時間)。
+    """
+    def __init__(self, jobs=None):
+        self.suffixes = ['.gz']
+        if importlib.util.find_spec('brotli') is not None:
+            self.suffixes.append('.br')
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        self.original = 0
+        self.compressed = dict.fromkeys(self.suffixes, 0)
+        self.files = 0
+        self.created = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown()
+
+    def _stale(self, path):
+        mtime = os.path.getmtime(path)
+        return [suffix for suffix in self.suffixes
+                if not os.path.exists(path + suffix) or os.path.getmtime(path + suffix) < mtime]
+
+    def compress(self, paths):
+        """壓縮所有檔案並累計大小，回傳本次的統計"""
+        futures = []
+        for path in paths:
+            stale = self._stale(path)
+            if stale:
+                futures.append((path, self.executor.submit(_compress_file, path, stale)))
+            else:
+                futures.append((path, None))
+        for path, future in futures:
+            sizes = future.result() if future is not None else {}
+            self.created += bool(sizes)
+            self.files += 1
+            self.original += os.path.getsize(path)
+            for suffix in self.suffixes:
+                self.compressed[suffix] += sizes.get(suffix) or os.path.getsize(path + suffix)
+        return self.stats()
+
+    def stats(self):
+        return {"files": self.files, "original_bytes": self.original,
+                **{f"{suffix[1:]}_bytes": size for suffix, size in self.compressed.items()}}
+
+    def summary(self):
+        names = {'.gz': 'gzip', '.br': 'brotli'}
+        parts = [f"{names[suffix]} {size:,} bytes (-{1 - size / self.original:.0%})"
+                 for suffix, size in self.compressed.items() if self.original]
+        return (f"預先壓縮: {self.files} 個檔案 (重新壓縮 {self.created} 個) "
+                f"{self.original:,} bytes -> " + '、'.join(parts))
+
+def render_service_worker(pages, assets):
+    """
+    產生 service worker 腳本
+    pages: [(網址, 內容雜湊)]，以 stale-while-revalidate 提供，雜湊讓頁面變動時腳本也跟著變動
+    assets: 網址本身已含內容雜湊的檔案 (資料分片、縮圖)，快取後不再重新下載，
+    新版安裝時未變動的檔案直接從舊快取複製。
+    """
+    version = hashlib.sha256(json.dumps([pages, assets]).encode('utf-8')).hexdigest()[:12]
+    return f"""// 由 網頁生成v2.py 產生，請勿手動修改
+const PREFIX = 'strawberry-kb-';
+const CACHE = PREFIX + '{version}';
+const RUNTIME = PREFIX + 'runtime';
+const RUNTIME_LIMIT = 200;
+const PAGES = {json.dumps(pages, ensure_ascii=False)};
+const ASSETS = {json.dumps(assets, ensure_ascii=False)};
+const ASSET_URLS = new Set(ASSETS.map(url => new URL(url, self.location).href));
+
+self.addEventListener('install', event => {{
+    event.waitUntil((async () => {{
+        const cache = await caches.open(CACHE);
+        await Promise.all(ASSETS.map(async url => {{
+            const key = new URL(url, self.location).href;
+            const cached = await caches.match(key);
+            if (cached) return cache.put(key, cached);
+            const response = await fetch(key);
+            if (!response.ok) throw new Error('無法快取 ' + url);
+            return cache.put(key, response);
+        }}));
+        const runtime = await caches.open(RUNTIME);
+        await Promise.all(PAGES.map(async ([url]) => {{
+            const response = await fetch(url, {{ cache: 'reload' }});
+            if (response.ok) await runtime.put(new URL(url, self.location).href, response);
+        }}));
+        await self.skipWaiting();
+    }})());
+}});
+
+self.addEventListener('activate', event => {{
+    event.waitUntil((async () => {{
+        for (const name of await caches.keys()) {{
+            if (name.startsWith(PREFIX) && name !== CACHE && name !== RUNTIME) await caches.delete(name);
+        }}
+        await self.clients.claim();
+    }})());
+}});
+
+async function trim(cache) {{
+    const keys = await cache.keys();
+    for (let i = 0; i < keys.length - RUNTIME_LIMIT; i++) await cache.delete(keys[i]);
+}}
+
+self.addEventListener('fetch', event => {{
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    if (ASSET_URLS.has(request.url)) {{
+        event.respondWith(caches.match(request.url, {{ cacheName: CACHE }}).then(cached => cached || fetch(request)));
+        return;
+    }}
+    // 其餘 (網頁本身、CDN 腳本、外部圖片): 先回傳快取，同時在背景更新
+    event.respondWith((async () => {{
+        const runtime = await caches.open(RUNTIME);
+        const cached = await runtime.match(request, {{ ignoreSearch: request.mode === 'navigate' }});
+        const network = fetch(request).then(async response => {{
+            if (response.ok || response.type === 'opaque') {{
+                await runtime.put(request.mode === 'navigate' ? request.url.split('?')[0] : request, response.clone());
+                await trim(runtime);
+            }}
+            return response;
+        }});
+        if (cached) {{
+            event.waitUntil(network.catch(() => {{}}));
+            return cached;
+        }}
+        return network;
+    }})());
+}});
+"""
+
+def write_service_worker(filepath, pages, assets):
+    """寫出 service worker，回傳 (雜湊, 是否寫入)"""
+    return atomic_write(filepath, render_service_worker(pages, assets).encode('utf-8'))
+
+# 模板中資料嵌入位置的標記，輸出時以串流方式替換成實際資料
+DATA_SLOT = '/*@@RAW_DATA@@*/'
+SEARCH_SLOT = '/*@@SEARCH_INDEX@@*/'
+# 搜尋索引每個檔案約含多少個位置 (約 300 KB)，以及最多分成幾個檔案
+SEARCH_POSTINGS_PER_FILE = 65536
+SEARCH_MAX_FILES = 256
+SHARD_SLOT = '/*@@SHARD_INFO@@*/'
+FACET_SLOT = '/*@@FACETS@@*/'
+SW_SLOT = '/*@@SERVICE_WORKER@@*/'
+PRERENDER_SLOT = '/*@@PRERENDER@@*/'
+_SLOT_RE = re.compile(r'(/\*@@[A-Z_]+@@\*/)')
+
+class SearchIndexBuilder:
+    """
+    建置時產生的搜尋倒排索引
+    以單字與相鄰兩字 (CJK bigram，如 炭疽 / 疽病) 為詞條，記錄出現的項目位置。
+    前端以詞條的項目清單取交集找出候選，不需逐筆掃描全部資料。
+    索引輸出為獨立檔案，前端第一次輸入搜尋時才下載，不增加網頁本身的大小。
+    詞條依第一個字的字碼分到多個檔案，檔案數隨索引大小增加，
+    前端只下載查詢用到的詞條所在的檔案，索引大小不會隨資料量拖慢首次搜尋。
+    """
+    FILENAME_RE = re.compile(r'search(-\d+)?(\.[0-9a-f]{12})?\.json')
+
+    def __init__(self, output_dir, url_base=None):
+        self.output_dir = output_dir
+        self.url_base = url_base if url_base is not None else os.path.basename(output_dir) + '/'
+        self.postings = ({}, {})   # 單字、雙字詞條 -> 項目位置 (array('I'))
+        self.buckets = 1
+        self.files = []
+        self.written = []
+
+    @staticmethod
+    def searchable_text(item):
+        """與前端原本比對的欄位一致: 標題、描述、標籤值"""
+        parts = [item.get("title", ""), item.get("description", "")]
+        parts.extend(str(v) for v in item.get("tags", {}).values() if v)
+        return '\n'.join(parts).lower()
+
+    def add(self, position, item):
+        text = self.searchable_text(item)
+        unigrams, bigrams = self.postings
+        for gram in set(text):
+            positions = unigrams.get(gram)
+            if positions is None:
+                positions = unigrams[gram] = array.array('I')
+            positions.append(position)
+        for gram in {text[i:i + 2] for i in range(len(text) - 1)}:
+            positions = bigrams.get(gram)
+            if positions is None:
+                positions = bigrams[gram] = array.array('I')
+            positions.append(position)
+
+    def to_json(self, postings=None):
+        """
+        輸出 (單字, 雙字) 詞條對照 postings 為一個索引檔，預設為全部詞條
+        格式: {"uni": [[詞條串接字串, [位置...]], ...], "bi": [...]}，回傳 UTF-8 bytes
+        位置清單相同的詞條合併成一組，大幅減少重複的位置陣列。
+        以位置清單的雜湊分組並逐組編碼，不必複製出整份索引的 Python 物件；
+        直接組成 bytes，避免含中文的字串以每字 2~4 bytes 儲存整份索引。
+        """
+        parts = []
+        for key, grams_positions in zip(("uni", "bi"), postings or self.postings):
+            groups = {}
+            for gram, positions in grams_positions.items():
+                if '\n' in gram:
+                    continue
+                digest = hashlib.blake2b(positions, digest_size=16).digest()
+                groups.setdefault(digest, (positions, []))[1].append(gram)
+            # 依雜湊排序以確保輸出與雜湊值在每次建置間保持一致
+            entries = b','.join(
+                b'[%s,[%s]]' % (json.dumps(''.join(sorted(grams)), ensure_ascii=False).encode('utf-8'),
+                                ','.join(map(str, positions)).encode('ascii'))
+                for _, (positions, grams) in sorted(groups.items()))
+            parts.append(b'"%s":[%s]' % (key.encode('ascii'), entries))
+        return b'{' + b','.join(parts) + b'}'
+
+    def finish(self):
+        """寫出索引檔 (檔名含內容雜湊) 並移除兩次建置以前的索引檔，回傳前端載入用的資訊"""
+        total = sum(len(positions) for postings in self.postings for positions in postings.values())
+        self.buckets = min(SEARCH_MAX_FILES, max(1, -(-total // SEARCH_POSTINGS_PER_FILE)))
+        split = [({}, {}) for _ in range(self.buckets)]
+        for kind, postings in enumerate(self.postings):
+            for gram, positions in postings.items():
+                split[ord(gram[0]) % self.buckets][kind][gram] = positions
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.files, self.written = [], []
+        for bucket, postings in enumerate(split):
+            data = self.to_json(postings)
+            name = f"search-{bucket}.{hashlib.sha256(data).hexdigest()[:12]}.json"
+            path = os.path.join(self.output_dir, name)
+            atomic_write(path, data)
+            self.written.append(path)
+            self.files.append(name)
+        prune_generations(self.output_dir, 'search', self.FILENAME_RE, self.files)
+        return {"base": self.url_base, "buckets": self.buckets, "files": self.files}
+
+    def versioned_files(self):
+        """索引檔名 (已含內容雜湊，內容變動時網址也跟著變動)"""
+        return self.files
+
+def remove_search_index(output_dir):
+    """未輸出搜尋索引時，上一次建置的索引檔再保留一次建置，之後刪除"""
+    prune_generations(output_dir, 'search', SearchIndexBuilder.FILENAME_RE, [])
+
+class FacetBuilder:
+    """
+    建置時預先計算的篩選資訊: 各分類筆數、各分類出現的標籤、每個標籤的項目位元集合
+    前端直接讀取，不必在每次狀態改變時重新掃描全部資料。
+    """
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.vocabulary = {"all": {}}   # 分類 -> 標籤 (dict 保留首次出現順序)
+        self.positions = {}             # 標籤 -> 項目位置清單
+        self.total = 0
+
+    def add(self, position, item):
+        category = item.get("category")
+        self.counts[category] += 1
+        self.total = position + 1
+        tags = self.vocabulary.setdefault(category, {})
+        for value in item.get("tags", {}).values():
+            if not value:
+                continue
+            tags[value] = None
+            self.vocabulary["all"][value] = None
+            positions = self.positions.setdefault(value, [])
+            if not positions or positions[-1] != position:
+                positions.append(position)
+
+    def bitset(self, positions):
+        """位置清單 -> 以 base64 編碼的 little-endian uint32 陣列，前端解為 Uint32Array"""
+        words = [0] * ((self.total + 31) // 32)
+        for position in positions:
+            words[position >> 5] |= 1 << (position & 31)
+        return base64.b64encode(struct.pack(f'<{len(words)}I', *words)).decode('ascii')
+
+    def to_json(self):
+        """
+        輸出格式: {"counts": {分類: 筆數}, "tags": {分類: [標籤...]}, "bits": {標籤: base64}}
+        標籤依首次出現順序輸出；注音排序 Python 無法重現，由前端在初始化時排序一次。
+        """
+        counts = {"all": self.total}
+        counts.update(sorted(self.counts.items()))
+        result = {
+            "counts": counts,
+            "tags": {category: list(tags) for category, tags in self.vocabulary.items()},
+            "bits": {value: self.bitset(positions) for value, positions in self.positions.items()},
+        }
+        return json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+
+class InlinePayload:
+    """預設模式: 每筆完整資料直接嵌入 rawData"""
+    def record(self, position, item):
+        """回傳要嵌入網頁的資料，子類別可改為只嵌入部分欄位"""
+        return item
+
+    def encode(self, position, item):
+        return json.dumps(self.record(position, item), ensure_ascii=False)
+
+    def begin(self):
+        return '['
+
+    def end(self):
+        return ']'
+
+    def finish(self):
+        return None
+
+    def discard(self):
+        """建置失敗時捨棄尚未寫出的檔案"""
+
+class ShardedPayload(InlinePayload):
+    """
+    分片模式: rawData 只放卡片所需的摘要欄位，
+    完整資料每 shard_size 筆寫成一個 JSON 分片，由前端在卡片出現時才載入。
+    """
+    # 只在分片中提供的大型欄位，摘要中以空值佔位
+    DETAIL_FIELDS = {"description": "", "details": [], "sources": []}
+    FILENAME_RE = re.compile(r'kb-\d+(\.[0-9a-f]{12})?\.json')
+
+    def __init__(self, output_dir, shard_size, url_base=None):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.url_base = url_base if url_base is not None else os.path.basename(output_dir) + '/'
+        self.files = []
+        self.written = []
+        self._buffer = []
+        self._staged = []
+
+    def record(self, position, item):
+        # 附上 id，前端確認分片與網頁是同一次建置的內容才合併
+        details = {"id": item["id"]}
+        details.update((key, item.get(key, empty)) for key, empty in self.DETAIL_FIELDS.items())
+        self._buffer.append(details)
+        if len(self._buffer) >= self.shard_size:
+            self._flush()
+        summary = {key: value for key, value in item.items() if key not in self.DETAIL_FIELDS}
+        summary.update(self.DETAIL_FIELDS)
+        summary["shard"] = position // self.shard_size
+        summary["loaded"] = False
+        return summary
+
+    def _flush(self):
+        data = json.dumps(self._buffer, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        # 檔名含內容雜湊，不會覆寫舊網頁仍在使用的分片；建置完成後才寫入，失敗時不留下檔案
+        name = f"kb-{len(self.files)}.{digest[:12]}.json"
+        path = os.path.join(self.output_dir, name)
+        os.makedirs(self.output_dir, exist_ok=True)
+        staged = stage_write(path, data)
+        if staged is not None:
+            self._staged.append(staged)
+        self.written.append(path)
+        self.files.append({"file": name, "count": len(self._buffer), "sha256": digest})
+        self._buffer = []
+
+    def finish(self):
+        """寫出最後一個分片與 manifest.json，並移除兩次建置以前的分片"""
+        if self._buffer:
+            self._flush()
+        commit_staged(self._staged)
+        manifest = {"shard_size": self.shard_size, "shards": self.files}
+        atomic_write(os.path.join(self.output_dir, 'manifest.json'),
+                     json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+        prune_generations(self.output_dir, 'shards', self.FILENAME_RE, [entry["file"] for entry in self.files])
+        return {
+            "base": self.url_base,
+            "size": self.shard_size,
+            "files": self.versioned_files(),
+        }
+
+    def discard(self):
+        discard_staged(self._staged)
+
+    def versioned_files(self):
+        """分片檔名 (已含內容雜湊，內容變動時網址也跟著變動)"""
+        return [entry["file"] for entry in self.files]
+
+class CompactPayload(InlinePayload):
+    """
+    精簡模式: 每筆資料改以固定欄位順序的陣列表示，字串 (分類、圖示、標籤、標題等)
+    以字串表編號取代，重複的鍵名與字串只出現一次。
+    字串表在所有資料輸出後才接在陣列之後，前端以 decodeCompact() 還原成原本的物件。
+    可包住 ShardedPayload，對分片模式的摘要使用相同編碼。
+    """
+    # (欄位, 編碼方式): str 字串編號、list 字串編號陣列、map 鍵值編號交錯的陣列、
+    # raw 原樣輸出、欄位名稱 tuple 則為物件陣列，每個物件依序攤平成字串編號
+    FIELDS = (
+        ("id", "str"), ("category", "str"), ("title", "str"), ("description", "str"),
+        ("tags", "map"), ("sugar", "raw"), ("images", "list"),
+        ("details", ("label", "value", "icon")), ("sources", "list"), ("icon_fallback", "str"),
+    )
+    _EMPTY = {"str": "", "map": {}, "raw": None, "list": []}
+
+    def __init__(self, inner=None):
+        self.inner = inner or InlinePayload()
+        self.strings = {}
+
+    def intern(self, value):
+        return self.strings.setdefault(str(value), len(self.strings))
+
+    def field(self, kind, value):
+        if kind == "str":
+            return self.intern(value)
+        if kind == "list":
+            return [self.intern(v) for v in value]
+        if kind == "map":
+            return [self.intern(v) for pair in value.items() for v in pair]
+        if kind == "raw":
+            return value
+        return [self.intern(entry.get(key, "")) for entry in value for key in kind]
+
+    def record(self, position, item):
+        item = self.inner.record(position, item)
+        row = [self.field(kind, item.get(key, self._EMPTY.get(kind, [])))
+               for key, kind in self.FIELDS]
+        known = {key for key, _ in self.FIELDS}
+        extra = {key: value for key, value in item.items() if key not in known}
+        if extra:
+            row.append(extra)
+        return row
+
+    def encode(self, position, item):
+        return json.dumps(self.record(position, item), ensure_ascii=False, separators=(',', ':'))
+
+    def begin(self):
+        return 'decodeCompact(['
+
+    def end(self):
+        table = {"fields": [list(field) for field in self.FIELDS], "strings": list(self.strings)}
+        return '], ' + json.dumps(table, ensure_ascii=False, separators=(',', ':')) + ')'
+
+    def finish(self):
+        return self.inner.finish()
+
+    def discard(self):
+        self.inner.discard()
+
+# 卡片上的分類標籤樣式 (網頁與預先輸出的卡片共用)
+CATEGORY_BADGE_CLASSES = {
+    "品種": "bg-pink-100 text-pink-800 dark:bg-pink-900 dark:text-pink-200",
+    "病蟲害": "bg-orange-100 text-orange-800 dark:bg-orange-900 dark:text-orange-200",
+    "缺素": "bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200",
+}
+DEFAULT_BADGE_CLASS = "bg-gray-100 text-gray-800"
+# 預先輸出成靜態 HTML 的卡片數 (大螢幕的前兩列)
+# 只在 --static-css 時輸出: 預設模式的 Tailwind CDN 是同步腳本，首次繪製本來就要等它執行完
+PRERENDER_CARDS = 8
+
+def render_card(item):
+    """
+    產生與網頁中 x-for 卡片外觀相同的靜態 HTML，讓腳本載入前就有內容可看
+    只有外觀，互動 (輪播、展開、來源清單) 在 Alpine 接手重新渲染後才有作用
+    """
+    esc = html.escape
+    images = item.get("images") or []
+    thumbs = item.get("thumbs") or []
+    if images:
+        thumb = thumbs[0] if thumbs else None
+        src = thumb["src"] if thumb else images[0]
+        srcset = f' srcset="{esc(thumb["srcset"])}" sizes="(min-width: 1024px) 25vw, (min-width: 768px) 50vw, 100vw"' if thumb else ''
+        media = (f'<div class="w-full h-full relative"><img src="{esc(src)}"{srcset} decoding="async" '
+                 f'class="w-full h-full object-cover absolute top-0 left-0" alt="Image"></div>')
+    else:
+        media = (f'<div class="flex flex-col items-center justify-center text-gray-300 dark:text-gray-700">'
+                 f'<i class="{esc(item.get("icon_fallback", ""))} text-6xl mb-2 opacity-50"></i>'
+                 f'<span class="text-xs">無圖片</span></div>')
+    badge = CATEGORY_BADGE_CLASSES.get(item["category"], DEFAULT_BADGE_CLASS)
+    tags = ''.join(
+        f'<div class="inline-flex items-center px-2.5 py-1 rounded bg-gray-100 dark:bg-gray-800 text-xs text-gray-600 '
+        f'dark:text-slate-200 border border-slate-300 dark:border-slate-600">'
+        f'<span class="opacity-70 mr-1">{esc(str(key))}:</span><span class="font-semibold">{esc(str(val))}</span></div>'
+        for key, val in item.get("tags", {}).items()
+    )
+    description = item.get("description") or ""
+    clamp = '' if len(description) <= 100 else ' line-clamp-3'
+    more = ('<button class="mt-1 text-xs font-bold text-strawberry-600 dark:text-strawberry-400 hover:underline '
+            'flex items-center gap-1"><span>閱讀更多</span><i class="fa-solid fa-angle-down"></i></button>'
+            if clamp else '')
+    details = ''.join(
+        f'<div class="flex items-start gap-3 text-sm"><div class="min-w-[20px] pt-1 text-center text-gray-400">'
+        f'<i class="{esc(d.get("icon", ""))}"></i></div><div>'
+        f'<span class="text-xs font-bold text-gray-500 dark:text-gray-500 block">{esc(str(d["label"]))}</span>'
+        f'<span class="text-gray-800 dark:text-gray-300">{esc(str(d["value"]))}</span></div></div>'
+        for d in item.get("details", [])
+    )
+    sources = item.get("sources") or []
+    source_button = (
+        f'<div class="mt-4 pt-2"><button class="text-xs text-gray-400 hover:text-strawberry-600 flex items-center '
+        f'gap-1 transition-colors"><i class="fa-solid fa-link"></i>參考資料來源 ({len(sources)})</button></div>'
+        if sources else '')
+    return f"""<div data-prerender class="bg-white dark:bg-gray-900 rounded-xl overflow-hidden shadow-lg border border-gray-200 dark:border-gray-700 card-hover flex flex-col h-full group">
+                <div class="relative w-full h-48 bg-gray-100 dark:bg-black flex items-center justify-center overflow-hidden">{media}<div class="absolute top-3 right-3"><span class="px-2 py-1 text-xs font-bold rounded shadow-sm {badge}">{esc(item["category"])}</span></div></div>
+                <div class="p-5 flex-1 flex flex-col">
+                    <div class="flex justify-between items-start mb-3"><h3 class="text-lg font-bold text-gray-900 dark:text-white leading-tight">{esc(item["title"])}</h3></div>
+                    <div class="flex flex-wrap gap-2 mb-4">{tags}</div>
+                    <div class="mb-4 relative"><div class="prose dark:prose-invert text-sm text-slate-700 dark:text-slate-300 leading-relaxed{clamp}">{description}</div>{more}</div>
+                    <div class="mt-auto space-y-3 pt-4 border-t border-gray-100 dark:border-gray-800">{details}</div>{source_button}
+                </div>
+            </div>
+            """
+
+def iter_html_chunks(items, payload=None, static_css=False, service_worker=None, search_index=None):
+    """
+    依序產生網頁的各個片段: 模板、逐筆資料、建置時計算的索引
+    不會在記憶體中組出完整頁面，items 可以是產生器
+    static_css 為 True 時以建置時產生的樣式表取代 Tailwind / Font Awesome CDN，
+    並預先輸出前幾張卡片的靜態 HTML，
+    service_worker 為要註冊的 service worker 網址 (None 時解除先前的註冊)，
+    search_index (SearchIndexBuilder) 為 None 時不產生搜尋索引，前端逐筆比對
+    """
+    payload = payload or InlinePayload()
+    facets = FacetBuilder()
+    prerender = []
+    for part in _SLOT_RE.split(_page_template(static_css)):
+        if part == DATA_SLOT:
+            yield payload.begin()
+            for index, item in enumerate(items):
+                if index:
+                    yield ', '
+                if search_index is not None:
+                    search_index.add(index, item)
+                facets.add(index, item)
+                if static_css and index < PRERENDER_CARDS:
+                    prerender.append(item)
+                yield payload.encode(index, item)
+            yield payload.end()
+        elif part == SEARCH_SLOT:
+            yield json.dumps(search_index.finish() if search_index is not None else None)
+        elif part == FACET_SLOT:
+            yield facets.to_json()
+        elif part == SHARD_SLOT:
+            yield json.dumps(payload.finish(), ensure_ascii=False)
+        elif part == SW_SLOT:
+            yield json.dumps(service_worker)
+        elif part == PRERENDER_SLOT:
+            yield ''.join(render_card(item) for item in prerender)
+        else:
+            yield part
 
 def generate_html(items):
     """生成包含 Alpine.js 邏輯的 HTML"""
-    
-    items_json = json.dumps(items, ensure_ascii=False)
+    return ''.join(iter_html_chunks(items))
+
+def write_html(items, filepath, payload=None, profiler=None, static_css=False, service_worker=None,
+               search_index=None):
+    """
+    將網頁片段直接串流寫入暫存檔並 fsync，同時計算內容雜湊
+    內容與現有檔案相同時捨棄暫存檔，否則以 rename 原子性替換目標檔，
+    讀取中的使用者或網頁伺服器不會看到寫到一半的檔案。
+    回傳 (雜湊, 位元組數, 是否寫入)
+    """
+    tmp_path = _tmp_path(filepath)
+    h = hashlib.sha256()
+    size = 0
+    f = open(tmp_path, 'wb')
+    try:
+        try:
+            for chunk in _profiled(profiler, 'generate_html', iter_html_chunks(items, payload, static_css, service_worker, search_index)):
+                data = chunk.encode('utf-8')
+                h.update(data)
+                size += len(data)
+                with _phase(profiler, 'write'):
+                    f.write(data)
+            with _phase(profiler, 'write'):
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            with _phase(profiler, 'write'):
+                f.close()
+    except BaseException:
+        os.remove(tmp_path)
+        if payload is not None:
+            payload.discard()
+        raise
+    with _phase(profiler, 'write'):
+        digest = h.hexdigest()
+        written = _commit_tmp(tmp_path, filepath, size, digest)
+        write_digest_file(filepath, digest)
+    return digest, size, written
 
+CSS_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strawberry_css.py')
+NET_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strawberry_net.py')
+_TAILWIND_CDN = '<script src="https://cdn.tailwindcss.com"></script>'
+
+@functools.lru_cache(maxsize=None)
+def static_stylesheet():
+    """
+    掃描模板與本程式原始碼 (資料中的圖示類別來自標準化函式) 產生靜態樣式表
+    回傳 (css, 無法產生樣式的類別清單)
+    """
+    import strawberry_css
+    with open(__file__, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return strawberry_css.build_stylesheet(_page_template(), source)
+
+@functools.lru_cache(maxsize=None)
+def _page_template(static_css=False):
+    """網頁模板，資料位置以 DATA_SLOT 標記"""
     html_content = f"""<!DOCTYPE html>
 <html lang="zh-TW" class="scroll-smooth">
 <head>
@@ -173,9 +1929,52 @@ def generate_html(items):
     </style>
 
     <script>
+        // 還原精簡模式 (--compact) 的資料: 依欄位編碼方式將字串編號換回字串
+        function decodeCompact(rows, table) {{
+            const s = table.strings;
+            const fields = table.fields.map(([name, kind]) => {{
+                let decode = v => v;
+                if (kind === 'str') decode = v => s[v];
+                else if (kind === 'list') decode = v => v.map(i => s[i]);
+                else if (kind === 'map') decode = v => {{
+                    const map = {{}};
+                    for (let i = 0; i < v.length; i += 2) map[s[v[i]]] = s[v[i + 1]];
+                    return map;
+                }};
+                else if (Array.isArray(kind)) decode = v => {{
+                    const list = [];
+                    for (let i = 0; i < v.length; i += kind.length) {{
+                        const entry = {{}};
+                        kind.forEach((key, k) => {{ entry[key] = s[v[i + k]]; }});
+                        list.push(entry);
+                    }}
+                    return list;
+                }};
+                return [name, decode];
+            }});
+            return rows.map(row => {{
+                const item = {{}};
+                fields.forEach(([name, decode], f) => {{ item[name] = decode(row[f]); }});
+                return row.length > fields.length ? Object.assign(item, row[fields.length]) : item;
+            }});
+        }}
+
         function appData() {{
+            // 搜尋索引不放進響應式資料，避免大型 Map 被 Alpine 包成 Proxy
+            const searchGrams = new Map();
+            const searchRequests = {{}};
             return {{
-                rawData: {items_json},
+                rawData: {DATA_SLOT},
+                searchInfo: {SEARCH_SLOT},
+                searchLoaded: {{}},
+                facets: {FACET_SLOT},
+                facetTags: null,
+                tagBits: null,
+                shardInfo: {SHARD_SLOT},
+                shardRequests: {{}},
+                virtualConfig: {json.dumps(VIRTUAL_GRID)},
+                virtualRows: {{ first: 0, last: 0, cols: 1 }},
+                grid: {{ virtual: false, items: [], padTop: 0, padBottom: 0 }},
                 searchQuery: '',
                 activeCategory: 'all',
                 activeTags: [],
@@ -227,9 +2026,78 @@ def generate_html(items):
                 ],
 
                 init() {{
+                    // 建置時預先輸出的卡片只供腳本載入前顯示，改由 Alpine 依資料渲染
+                    document.querySelectorAll('[data-prerender]').forEach(el => el.remove());
                     window.addEventListener('scroll', () => {{
                         this.showScrollTop = window.scrollY > 300;
                     }});
+                    let pending = false;
+                    const update = () => {{
+                        if (pending) return;
+                        pending = true;
+                        requestAnimationFrame(() => {{ pending = false; this.updateVirtualRows(); }});
+                    }};
+                    window.addEventListener('scroll', update, {{ passive: true }});
+                    window.addEventListener('resize', update);
+                    this.$nextTick(() => this.updateVirtualRows());
+                }},
+
+                // --- 虛擬化網格: 依捲動位置計算需要掛載的列範圍 ---
+                // 與網格的 md / lg 斷點一致；視窗寬度不是響應式資料，只在 updateVirtualRows 中讀取
+                gridCols() {{
+                    const w = window.innerWidth;
+                    return w >= 1024 ? 4 : (w >= 768 ? 2 : 1);
+                }},
+
+                updateVirtualRows() {{
+                    const grid = this.$refs.grid;
+                    if (!grid) return;
+                    const cfg = this.virtualConfig;
+                    const rowH = cfg.cardHeight + cfg.gap;
+                    const top = grid.getBoundingClientRect().top + window.scrollY;
+                    const first = Math.max(0, Math.floor((window.scrollY - top) / rowH) - cfg.overscan);
+                    const last = Math.max(0, Math.ceil((window.scrollY + window.innerHeight - top) / rowH) + cfg.overscan);
+                    const cols = this.gridCols();
+                    // 只有列範圍或欄數改變時才觸發重新渲染
+                    const rows = this.virtualRows;
+                    if (first !== rows.first || last !== rows.last || cols !== rows.cols) {{
+                        this.virtualRows = {{ first, last, cols }};
+                    }}
+                }},
+
+                get gridView() {{
+                    const items = this.filteredItems;
+                    const cfg = this.virtualConfig;
+                    if (items.length <= cfg.threshold) return {{ virtual: false, items, padTop: 0, padBottom: 0 }};
+                    const cols = this.virtualRows.cols;
+                    const rowH = cfg.cardHeight + cfg.gap;
+                    const rows = Math.ceil(items.length / cols);
+                    const first = Math.min(this.virtualRows.first, rows);
+                    const last = Math.min(Math.max(this.virtualRows.last, first + 1), rows);
+                    return {{
+                        virtual: true,
+                        items: items.slice(first * cols, last * cols),
+                        padTop: first * rowH,
+                        padBottom: (rows - last) * rowH,
+                    }};
+                }},
+
+                // 分片模式下，卡片出現時才載入該項目所在分片的完整資料
+                ensureDetails(item) {{
+                    if (!this.shardInfo || item.loaded !== false) return;
+                    const k = item.shard;
+                    if (!this.shardRequests[k]) {{
+                        this.shardRequests[k] = fetch(this.shardInfo.base + this.shardInfo.files[k])
+                            .then(r => r.json())
+                            .then(records => {{
+                                records.forEach((full, j) => {{
+                                    const item = this.rawData[k * this.shardInfo.size + j];
+                                    // 只合併同一次建置的內容，避免把別筆資料的描述套到卡片上
+                                    if (item && item.id === full.id) Object.assign(item, full, {{ loaded: true }});
+                                }});
+                            }})
+                            .catch(() => {{ delete this.shardRequests[k]; }});
+                    }}
                 }},
                 
                 // ... (篩選與其他邏輯保持不變) ...
@@ -249,47 +2117,125 @@ def generate_html(items):
                     return ((max - min) / this.rangeMax) * 100 + '%';
                 }},
 
+                // 下載詞條所在的索引檔 (依第一個字的字碼分檔)，展開為 詞條 -> 項目位置 的 Map
+                loadSearchBucket(b) {{
+                    if (searchRequests[b]) return;
+                    searchRequests[b] = fetch(this.searchInfo.base + this.searchInfo.files[b])
+                        .then(r => r.json())
+                        .then(index => {{
+                            for (const [size, groups] of [[1, index.uni], [2, index.bi]]) {{
+                                for (const [joined, positions] of groups) {{
+                                    const chars = Array.from(joined);
+                                    for (let i = 0; i < chars.length; i += size) {{
+                                        searchGrams.set(chars.slice(i, i + size).join(''), positions);
+                                    }}
+                                }}
+                            }}
+                            this.searchLoaded[b] = true;
+                        }})
+                        .catch(() => {{ delete searchRequests[b]; }});
+                }},
+
+                // 以詞條的項目清單交集找出候選位置；查詢為空或索引尚未載入時回傳 null (逐筆比對)
+                searchCandidates(q) {{
+                    if (!q || !this.searchInfo) return null;
+                    const chars = Array.from(q);
+                    const grams = chars.length === 1 ? [q] : chars.slice(1).map((c, i) => chars[i] + c);
+                    let ready = true;
+                    for (const gram of grams) {{
+                        const b = gram.codePointAt(0) % this.searchInfo.buckets;
+                        if (!this.searchLoaded[b]) {{ this.loadSearchBucket(b); ready = false; }}
+                    }}
+                    if (!ready) return null;
+                    if (chars.length === 1) return searchGrams.get(q) || [];
+                    let result = null;
+                    for (let i = 0; i < chars.length - 1; i++) {{
+                        const positions = searchGrams.get(chars[i] + chars[i + 1]);
+                        if (!positions) return [];
+                        if (result === null) {{ result = positions; continue; }}
+                        const merged = [];
+                        let a = 0, b = 0;
+                        while (a < result.length && b < positions.length) {{
+                            if (result[a] === positions[b]) {{ merged.push(result[a]); a++; b++; }}
+                            else if (result[a] < positions[b]) a++;
+                            else b++;
+                        }}
+                        result = merged;
+                        if (result.length === 0) break;
+                    }}
+                    return result;
+                }},
+
+                // 將建置時產生的篩選資訊展開: 標籤依注音排序、位元集合解為 Uint32Array (只做一次)
+                buildFacets() {{
+                    const collator = new Intl.Collator('zh-TW', {{ collation: 'zhuyin' }});
+                    const tags = {{}};
+                    for (const [cat, values] of Object.entries(this.facets.tags)) {{
+                        tags[cat] = values.slice().sort(collator.compare);
+                    }}
+                    const bits = new Map();
+                    for (const [tag, encoded] of Object.entries(this.facets.bits)) {{
+                        const bytes = Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+                        bits.set(tag, new Uint32Array(bytes.buffer));
+                    }}
+                    this.tagBits = bits;
+                    this.facetTags = tags;
+                }},
+
+                // 已選標籤的位元集合交集，未選標籤時回傳 null
+                get tagMask() {{
+                    if (this.activeTags.length === 0) return null;
+                    if (!this.tagBits) this.buildFacets();
+                    let mask = null;
+                    for (const tag of this.activeTags) {{
+                        const bits = this.tagBits.get(tag);
+                        if (!bits) return new Uint32Array(0);
+                        if (mask === null) {{ mask = bits.slice(); continue; }}
+                        for (let w = 0; w < mask.length; w++) mask[w] &= bits[w];
+                    }}
+                    return mask;
+                }},
+
                 get filteredItems() {{
                     if (!this.rawData) return [];
-                    return this.rawData.filter(item => {{
+                    const q = (this.searchQuery || '').toLowerCase();
+                    const candidates = this.searchCandidates(q);
+                    const mask = this.tagMask;
+                    // 兩字以內的查詢由索引直接確定，更長的查詢需再確認字串相連；
+                    // 沒有索引 (或尚未載入) 時逐筆比對，尚未載入完整資料的分片項目只比對標題與標籤
+                    const indexed = candidates !== null;
+                    const verify = q !== '' && (!indexed || Array.from(q).length > 2);
+                    const currentMin = Math.min(this.minSugar, this.maxSugar);
+                    const currentMax = Math.max(this.minSugar, this.maxSugar);
+                    const checkSugar = this.activeCategory === '品種' || this.activeCategory === 'all';
+                    const total = candidates === null ? this.rawData.length : candidates.length;
+                    const result = [];
+                    for (let k = 0; k < total; k++) {{
+                        const i = candidates === null ? k : candidates[k];
+                        if (mask && !((mask[i >>> 5] >>> (i & 31)) & 1)) continue;
+                        const item = this.rawData[i];
                         const matchCat = this.activeCategory === 'all' || item.category === this.activeCategory;
-                        const q = (this.searchQuery || '').toLowerCase();
-                        const matchSearch = item.title.toLowerCase().includes(q) || 
+                        const matchSearch = !verify || (indexed && item.loaded === false) || item.title.toLowerCase().includes(q) || 
                                           (item.description && item.description.toLowerCase().includes(q)) ||
                                           Object.values(item.tags).some(v => v && v.toLowerCase().includes(q));
-                        let matchTags = true;
-                        if (this.activeTags.length > 0) {{
-                            const itemTagValues = Object.values(item.tags);
-                            matchTags = this.activeTags.every(tag => itemTagValues.includes(tag));
-                        }}
                         let matchSugar = true;
-                        if (this.activeCategory === '品種' || this.activeCategory === 'all') {{
+                        if (checkSugar) {{
                             const s = item.sugar;
-                            const currentMin = Math.min(this.minSugar, this.maxSugar);
-                            const currentMax = Math.max(this.minSugar, this.maxSugar);
                             if (s === 0) {{ matchSugar = (currentMin === 0); }} 
                             else {{ matchSugar = s >= currentMin && s <= currentMax; }}
                         }}
-                        return matchCat && matchSearch && matchTags && matchSugar;
-                    }});
+                        if (matchCat && matchSearch && matchSugar) result.push(item);
+                    }}
+                    return result;
                 }},
 
                 get availableTags() {{
-                    const tags = new Set();
-                    if (this.rawData) {{
-                        this.rawData.forEach(item => {{
-                             if (this.activeCategory === 'all' || item.category === this.activeCategory) {{
-                                 Object.values(item.tags).forEach(val => val && tags.add(val));
-                             }}
-                        }});
-                    }}
-                    return Array.from(tags).sort((a, b) => a.localeCompare(b, 'zh-TW', {{ collation: 'zhuyin' }}));
+                    if (!this.facetTags) this.buildFacets();
+                    return this.facetTags[this.activeCategory] || [];
                 }},
 
                 getCount(catId) {{
-                    if (!this.rawData) return 0;
-                    if (catId === 'all') return this.rawData.length;
-                    return this.rawData.filter(i => i.category === catId).length;
+                    return this.facets.counts[catId] || 0;
                 }},
 
                 toggleTagFilter(tag) {{
@@ -306,12 +2252,7 @@ def generate_html(items):
                 }},
 
                 getCategoryBadgeClass(cat) {{
-                    switch(cat) {{
-                        case '品種': return 'bg-pink-100 text-pink-800 dark:bg-pink-900 dark:text-pink-200';
-                        case '病蟲害': return 'bg-orange-100 text-orange-800 dark:bg-orange-900 dark:text-orange-200';
-                        case '缺素': return 'bg-yellow-100 text-yellow-800 dark:bg-yellow-900 dark:text-yellow-200';
-                        default: return 'bg-gray-100 text-gray-800';
-                    }}
+                    return {json.dumps(CATEGORY_BADGE_CLASSES, ensure_ascii=False)}[cat] || '{DEFAULT_BADGE_CLASS}';
                 }},
                 
                 get themeIcon() {{
@@ -340,7 +2281,7 @@ def generate_html(items):
             }}
         }}
     </script>
-    <script src="https://cdn.jsdelivr.net/npm/alpinejs@3.x.x/dist/cdn.min.js"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/alpinejs@3.x.x/dist/cdn.min.js"></script>
 </head>
 <body class="bg-gray-50 text-slate-900 dark:bg-black dark:text-gray-100 transition-colors duration-300 min-h-screen"
       x-data="appData()" 
@@ -436,18 +2377,26 @@ def generate_html(items):
             </div>
         </div>
 
-        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6">
-            <template x-for="item in filteredItems" :key="item.id">
-                <div class="bg-white dark:bg-gray-900 rounded-xl overflow-hidden shadow-lg border border-gray-200 dark:border-gray-700 card-hover flex flex-col h-full group">
+        <div class="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6" x-ref="grid"
+             x-effect="grid = gridView"
+             :style="grid.virtual ? 'padding-top: ' + grid.padTop + 'px; padding-bottom: ' + grid.padBottom + 'px' : ''">
+            {PRERENDER_SLOT}
+            <template x-for="item in grid.items" :key="item.id">
+                <div class="bg-white dark:bg-gray-900 rounded-xl overflow-hidden shadow-lg border border-gray-200 dark:border-gray-700 card-hover flex flex-col h-full group"
+                     :style="grid.virtual ? 'height: ' + virtualConfig.cardHeight + 'px' : ''"
+                     x-init="ensureDetails(item)">
                     
                     <div class="relative w-full h-48 bg-gray-100 dark:bg-black flex items-center justify-center overflow-hidden" 
                          x-data="{{ currentImgIdx: 0 }}">
                         <template x-if="item.images && item.images.length > 0">
                             <div class="w-full h-full relative">
                                 <template x-for="(img, idx) in item.images" :key="idx">
-                                    <img :src="img" 
+                                    <img :src="item.thumbs && item.thumbs[idx] ? item.thumbs[idx].src : img"
+                                         :srcset="item.thumbs && item.thumbs[idx] ? item.thumbs[idx].srcset : null"
+                                         sizes="(min-width: 1024px) 25vw, (min-width: 768px) 50vw, 100vw"
+                                         loading="lazy" decoding="async"
                                          x-show="currentImgIdx === idx"
-                                         x-transition:enter="transition opacity duration-300"
+                                         x-transition:enter="transition-opacity duration-300"
                                          x-transition:enter-start="opacity-0"
                                          x-transition:enter-end="opacity-100"
                                          class="w-full h-full object-cover absolute top-0 left-0 cursor-pointer hover:opacity-90 transition-opacity"
@@ -471,7 +2420,7 @@ def generate_html(items):
                         </div>
                     </div>
 
-                    <div class="p-5 flex-1 flex flex-col">
+                    <div class="p-5 flex-1 flex flex-col" :class="grid.virtual ? 'overflow-y-auto' : ''">
                         <div class="flex justify-between items-start mb-3">
                             <h3 class="text-lg font-bold text-gray-900 dark:text-white leading-tight" x-text="item.title"></h3>
                         </div>
@@ -589,32 +2538,478 @@ def generate_html(items):
             <p class="mt-2">&copy; 2025 草莓知識百科. By XPRAMT</p>
         </div>
     </footer>
+
+    <script>
+        // 離線快取: 建置時加上 --sw 才會註冊，否則移除先前註冊的 service worker
+        (function (swUrl) {{
+            if (!('serviceWorker' in navigator)) return;
+            if (swUrl) {{
+                navigator.serviceWorker.register(swUrl, {{ scope: location.pathname }});
+                return;
+            }}
+            navigator.serviceWorker.getRegistrations().then(regs => regs.forEach(reg => {{
+                const worker = reg.active || reg.waiting || reg.installing;
+                if (worker && worker.scriptURL.endsWith('/{SERVICE_WORKER}')) reg.unregister();
+            }}));
+        }})({SW_SLOT});
+    </script>
 </body>
 </html>"""
     
+    if static_css:
+        # 從 Tailwind CDN 到 tailwind.config 設定的區塊整段換成靜態樣式表
+        start = html_content.index(_TAILWIND_CDN)
+        end = html_content.index('</script>', html_content.index('tailwind.config')) + len('</script>')
+        css, _ = static_stylesheet()
+        html_content = html_content[:start] + f'<style>\n{css}    </style>' + html_content[end:]
     return html_content
 
-def main():
-    print("正在讀取資料...")
-    varieties_data = load_data(VARIETIES_JSON)
-    disease_data = load_data(DISEASE_JSON)
-    combined_data = {**varieties_data, **disease_data}
+# --- 建置效能分析 (--profile) ---
+
+class BuildProfiler:
+    """
+    記錄各階段的牆鐘時間、CPU 時間與記憶體用量
+    管線是逐筆串流的，各階段會交錯執行；以堆疊記錄目前所在階段，
+    切換時把經過的時間記到堆疊頂端的階段，因此各階段時間互不重複計算。
+    記憶體預設在每次切換時取樣目前的常駐記憶體 (RSS)，記錄各階段期間看到的最大值，成本與計時相當；
+    (最大常駐記憶體 max RSS 只會上升，高峰低於先前階段的階段會看不出用量，因此不以它的增量計算)
+    trace_memory 為 True 時另以 tracemalloc 記錄各階段的 Python 記憶體高峰，
+    tracemalloc 會讓建置慢上數倍，只在需要細查記憶體時使用。
+    """
+    def __init__(self, trace_memory=False):
+        self.phases = {}
+        self.trace_memory = trace_memory
+        self._stack = []
+        self._mark = None
+        self._rss = _rss_sampler()
+        self._started = (time.perf_counter(), time.process_time())
+        if trace_memory:
+            tracemalloc.start()
+        self._switch()
+
+    def _switch(self):
+        now = (time.perf_counter(), time.process_time(), self._rss() if self._rss else 0)
+        if self._stack:
+            stats = self.phases[self._stack[-1]]
+            stats["wall_s"] += now[0] - self._mark[0]
+            stats["cpu_s"] += now[1] - self._mark[1]
+            if self._rss:
+                stats["peak_rss_kb"] = max(stats["peak_rss_kb"], self._mark[2], now[2])
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                stats["peak_traced_bytes"] = max(stats["peak_traced_bytes"], peak)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            # 扣除 tracemalloc 本身的額外開銷後才開始計時
+            now = (time.perf_counter(), time.process_time(), now[2])
+        self._mark = now
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = {"wall_s": 0.0, "cpu_s": 0.0}
+            if self._rss:
+                self.phases[name]["peak_rss_kb"] = 0
+            if self.trace_memory:
+                self.phases[name]["peak_traced_bytes"] = 0
+        self._switch()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._switch()
+            self._stack.pop()
+
+    def wrap(self, name, iterable):
+        """將產生器的每次取值計入指定階段"""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def save(self, filepath, **extra):
+        if self.trace_memory:
+            tracemalloc.stop()
+        wall = time.perf_counter() - self._started[0]
+        cpu = time.process_time() - self._started[1]
+        data = {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "python": sys.version.split()[0],
+            "total": {"wall_s": wall, "cpu_s": cpu, "max_rss_kb": _max_rss_kb()},
+            "phases": self.phases,
+            **extra,
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+def _max_rss_kb():
+    """行程的最大常駐記憶體 (僅支援 Unix，其他平台回傳 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+def _rss_sampler():
+    """
+    回傳讀取目前常駐記憶體 (KB) 的函式: Linux 讀取 /proc/self/statm，
+    其他平台使用 psutil (若已安裝)，都無法使用時回傳 None
+    """
+    try:
+        statm = open('/proc/self/statm', 'rb', buffering=0)
+    except OSError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        process = psutil.Process()
+        return lambda: process.memory_info().rss // 1024
+    page_kb = os.sysconf('SC_PAGE_SIZE') // 1024
+    # 每次切換階段都會呼叫: 以 pread 重複讀取同一個檔案描述符，不必每次開檔
+    return lambda: int(os.pread(statm.fileno(), 64, 0).split()[1]) * page_kb
+
+def _profiled(profiler, name, iterable):
+    return profiler.wrap(name, iterable) if profiler is not None else iterable
+
+def _phase(profiler, name):
+    return profiler.phase(name) if profiler is not None else contextlib.nullcontext()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="生成草莓知識百科網頁")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="忽略增量建置快取，完整重建")
+    parser.add_argument('--shard-size', type=int, metavar='N',
+                        help=f"將完整資料每 N 筆分片輸出到 {SHARD_DIR}/，網頁只內嵌摘要")
+    parser.add_argument('--search-index', action='store_true',
+                        help=f"將搜尋索引輸出到 {SHARD_DIR}/，第一次搜尋時才下載 (分片模式一律啟用)")
+    parser.add_argument('--compact', action='store_true',
+                        help="以字串表與陣列精簡內嵌資料，由前端載入時還原")
+    parser.add_argument('--static-css', action='store_true',
+                        help="以建置時產生的精簡樣式表取代 Tailwind 與 Font Awesome CDN")
+    parser.add_argument('--optimize-images', action='store_true',
+                        help=f"產生縮圖與燈箱用 WebP 至 {IMAGE_OUTPUT_DIR}/ (需要 Pillow)")
+    parser.add_argument('--remote-images', action='store_true',
+                        help=f"下載外部網址的圖片到 {IMAGE_CACHE_DIR}/ 快取並一併產生縮圖 (包含 --optimize-images)")
+    parser.add_argument('--data-dir', metavar='DIR',
+                        help="讀取目錄下所有 JSON 檔案 (取代預設的兩個資料檔)")
+    parser.add_argument('--pages', action='store_true',
+                        help=f"另外為每個項目產生不需 JavaScript 的靜態頁面至 {PAGES_DIR}/")
+    parser.add_argument('--sw', action='store_true',
+                        help=f"產生離線快取用的 service worker ({SERVICE_WORKER}) 並在網頁中註冊")
+    parser.add_argument('--precompress', action='store_true',
+                        help="為產生的檔案另外輸出最高壓縮等級的 .gz 與 .br (brotli 需要 brotli 套件)")
+    parser.add_argument('--check-links', nargs='?', const='link_report.json', metavar='FILE',
+                        help="不生成網頁，改為檢查所有資料來源與圖片網址，失效連結輸出為 JSON "
+                             "(預設 link_report.json)")
+    parser.add_argument('--report', metavar='FILE',
+                        help="將不合格資料的檢查報告 (檔案、索引、欄位) 輸出為 JSON，並比對描述相似的疑似重複項目")
+    parser.add_argument('--profile', nargs='?', const='build_profile.json', metavar='FILE',
+                        help="記錄各階段的時間與記憶體用量並輸出為 JSON (預設 build_profile.json)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="效能分析另以 tracemalloc 記錄各階段的 Python 記憶體高峰 (建置會明顯變慢)")
+    parser.add_argument('--watch', action='store_true',
+                        help="持續監看輸入檔案與模板，變動時自動重新生成")
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help="平行處理的行程數 (預設為 CPU 核心數，1 表示逐一處理；"
+                             "讀取資料時只有指定 --data-dir 或 --jobs 才平行處理)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.optimize_images = args.optimize_images or args.remote_images
+    if args.optimize_images and importlib.util.find_spec('PIL') is None:
+        print("警告: 未安裝 Pillow，略過圖片最佳化 (pip install Pillow)")
+        args.optimize_images = args.remote_images = False
+    if args.precompress and importlib.util.find_spec('brotli') is None:
+        print("警告: 未安裝 brotli，只產生 .gz (pip install brotli)")
+    cache = None if args.no_cache else BuildCache(BUILD_CACHE)
+
+    if args.watch:
+        watch(args, cache)
+        return 0
+
+    if args.profile_memory and not args.profile:
+        args.profile = 'build_profile.json'
+    profiler = BuildProfiler(args.profile_memory) if args.profile else None
+    try:
+        if args.check_links:
+            return check_links(args)
+        stats = build_once(args, cache, profiler)
+    except DataReadError as e:
+        print(f"錯誤: {e}，建置中止，未寫入任何輸出")
+        return 1
+    if profiler is not None:
+        profiler.save(args.profile, **stats)
+        print(f"效能分析已輸出至: {args.profile}")
+    return 0
+
+def check_links(args):
+    """檢查資料中的所有網址並輸出失效連結報告，有失效連結時回傳 1"""
+    items = build_pipeline(iter_sources(_input_files(args), ValidationReport()))
+    links = collect_links(items)
+    checker = LinkChecker(write=atomic_write)
+    start = time.perf_counter()
+    results = checker.check(links)
+    checker.save()
+    broken = [
+        {"url": url, "status": result["status"], "error": result["error"],
+         "items": [{"id": item_id, "field": field} for item_id, field in links[url]]}
+        for url, result in results.items() if not result["ok"]
+    ]
+    report = {"checked": len(results), "broken": broken}
+    atomic_write(args.check_links, json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'))
+    print(f"連結檢查: {len(results)} 個網址 (連線檢查 {checker.checked} 個，沿用快取 {checker.cached} 個)，"
+          f"失效 {len(broken)} 個，耗時 {time.perf_counter() - start:.1f} 秒")
+    for entry in broken[:20]:
+        reason = entry["status"] or entry["error"]
+        print(f"  失效: {entry['url']} ({reason}) - {', '.join(i['id'] for i in entry['items'])}")
+    if len(broken) > 20:
+        print(f"  ... 其餘 {len(broken) - 20} 個請見報告")
+    print(f"報告已輸出至: {args.check_links}")
+    return 1 if broken else 0
+
+def _input_files(args):
+    return list_data_files(args.data_dir) if args.data_dir else [VARIETIES_JSON, DISEASE_JSON]
+
+def build_once(args, cache, profiler=None, sources=None):
+    """
+    執行一次建置 (輸入未變動時直接略過)，回傳建置統計
+    sources (SourceCache) 為監看模式保留的各檔案標準化結果，只重新讀取有變動的檔案
+    """
+    input_files = _input_files(args)
+    options = {"shard_size": args.shard_size, "search_index": args.search_index,
+               "optimize_images": args.optimize_images,
+               "remote_images": args.remote_images,
+               "pages": args.pages, "compact": args.compact, "precompress": args.precompress,
+               "static_css": args.static_css and _file_digest(CSS_MODULE), "sw": args.sw}
 
-    if not combined_data:
+    with _phase(profiler, 'cache_check'):
+        unchanged = (cache is not None and cache.inputs_unchanged(input_files, options)
+                     and os.path.exists(OUTPUT_HTML) and cache.outputs_intact())
+    if unchanged and profiler is not None:
+        # 效能分析需要各階段的數據，輸入未變動時仍完整建置 (輸出內容相同的檔案不會重寫)
+        print("效能分析: 輸入未變動，仍完整建置以記錄各階段")
+        unchanged = False
+    if unchanged:
+        cache.save(cache.output_hash)
+        print(f"資料未變動，略過生成: {OUTPUT_HTML}")
+        stats = {"skipped": True}
+    else:
+        stats = _run_build(args, cache, input_files, profiler, sources)
+    stats.update(inputs=input_files, options=options)
+    return stats
+
+def _snapshot(paths):
+    """記錄檔案的修改時間與大小，用來偵測變動"""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            state[path] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            state[path] = None
+    return state
+
+def watch(args, cache):
+    """
+    監看輸入 JSON 與產生器程式 (含網頁模板)，變動後重新生成
+    連續寫入會等到檔案穩定 WATCH_DEBOUNCE 秒後才處理；快取與各輸入檔標準化後的項目保留在記憶體中，
+    只重新讀取、標準化有變動的檔案。網頁以暫存檔替換的方式原子性更新。
+    產生器程式本身變動時重新啟動行程以載入新的模板。
+    """
+    script = os.path.abspath(__file__)
+    # 產生器程式與匯入的模組變動時都需要重新啟動
+    code = [script, NET_MODULE] + ([CSS_MODULE] if args.static_css else [])
+    if args.jobs is None:
+        # 監看模式重視單次延遲，行程池的啟動成本通常大於平行處理的收益
+        args.jobs = 1
+    if cache is not None:
+        cache.autosave = False
+
+    sources = SourceCache()
+
+    def watched():
+        return _input_files(args) + code
+
+    def rebuild():
+        try:
+            build_once(args, cache, sources=sources)
+            return True
+        except DataReadError as e:
+            print(f"錯誤: {e}，保留目前的網頁，等待下次變更")
+            return False
+
+    rebuild()
+    last = _snapshot(watched())
+    print(f"監看中: {', '.join(watched())} (Ctrl+C 結束)")
+    try:
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            current = _snapshot(watched())
+            if current == last:
+                continue
+            while True:
+                time.sleep(WATCH_DEBOUNCE)
+                settled = _snapshot(watched())
+                if settled == current:
+                    break
+                current = settled
+            if any(current.get(path) != last.get(path) for path in code):
+                print("產生器程式已變更，重新啟動...")
+                if cache is not None:
+                    cache.write()
+                os.execv(sys.executable, [sys.executable, script] + sys.argv[1:])
+            last = current
+            start = time.perf_counter()
+            if rebuild():
+                print(f"重新生成完成 ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    except KeyboardInterrupt:
+        print("結束監看")
+    finally:
+        if cache is not None and cache.output_hash is not None:
+            cache.write()
+
+def _run_build(args, cache, input_files, profiler, sources=None):
+    """組合資料管線並輸出網頁，回傳建置統計"""
+    report = ValidationReport()
+    with contextlib.ExitStack() as stack:
+        print("正在讀取資料並生成網頁...")
+        # 檔案少時行程池的啟動與記憶體成本大於平行處理的收益，預設逐一讀取
+        parallel = args.jobs > 1 if args.jobs is not None else bool(args.data_dir)
+        if sources is not None:
+            items = _profiled(profiler, 'load_and_normalize', sources.iter_items(input_files, report))
+        elif parallel and len(input_files) > 1:
+            items = _profiled(profiler, 'load_and_normalize',
+                              iter_parallel(input_files, args.jobs, report))
+        else:
+            records = _profiled(profiler, 'load_data', iter_sources(input_files, report))
+            items = _profiled(profiler, 'normalize_data', build_pipeline(records))
+        detector = DuplicateDetector(descriptions=bool(args.report))
+        items = _profiled(profiler, 'dedupe', dedupe_items(items, detector))
+        optimizer = None
+        if args.optimize_images:
+            base_dir = os.path.dirname(OUTPUT_HTML) or '.'
+            fetcher = None
+            if args.remote_images:
+                fetcher = stack.enter_context(RemoteImageFetcher(os.path.join(base_dir, IMAGE_CACHE_DIR), write=atomic_write))
+            optimizer = stack.enter_context(ImageOptimizer(
+                os.path.join(base_dir, IMAGE_OUTPUT_DIR), base_dir, args.jobs, fetcher))
+            items = _profiled(profiler, 'optimize_images', optimize_item_images(items, optimizer))
+        pages = None
+        if args.pages:
+            pages_dir = os.path.join(os.path.dirname(OUTPUT_HTML), PAGES_DIR)
+            pages = stack.enter_context(PageBuilder(pages_dir, args.jobs))
+            items = _profiled(profiler, 'item_pages', build_item_pages(items, pages))
+        stats = _build(args, cache, items, optimizer, profiler)
+        if pages is not None:
+            with _phase(profiler, 'item_pages'):
+                pages.finish()
+            print(f"單頁: 重新產生 {pages.rendered} 頁，沿用 {pages.reused} 頁 ({pages.output_dir})")
+        artifacts = list(stats.get("output_bytes", {}))
+        manifests = list(stats.pop("manifests", []))
+        if pages is not None:
+            artifacts.extend(pages.paths())
+            manifests.append(os.path.join(pages.output_dir, PageBuilder.MANIFEST))
+        if args.precompress and artifacts:
+            compressor = stack.enter_context(Precompressor(args.jobs))
+            with _phase(profiler, 'precompress'):
+                stats["precompressed"] = compressor.compress(artifacts)
+            print(compressor.summary())
+        else:
+            for path in artifacts:
+                _drop_stale_siblings(path)
+
+    # 單頁與預先壓縮也完成後才記錄快取，中途失敗時下次不會誤判為未變動
+    if cache is not None and "output_sha256" in stats:
+        cache.save(stats["output_sha256"], {path: os.path.getsize(path) for path in artifacts + manifests})
+    if detector.merged or detector.renamed or detector.duplicates:
+        print(detector.summary())
+        detector.report_to(report)
+    if report.issues:
+        print(f"資料檢查: 略過 {report.skipped} 筆不合格資料，"
+              f"{report.count('error')} 個錯誤、{report.count('warning')} 個警告")
+    if args.report:
+        report.save(args.report)
+        print(f"檢查報告已輸出至: {args.report}")
+    stats["invalid_records"] = report.skipped
+    return stats
+
+def _build(args, cache, items, optimizer, profiler=None):
+    """將管線產生的項目寫成網頁並回報結果"""
+    first = next(items, None)
+    if first is None:
         print("警告: 沒有讀取到任何資料，請檢查 JSON 檔案路徑與內容。")
-        return
+        return {"items": 0}
 
-    print("正在處理資料結構...")
-    normalized_items = normalize_data(combined_data)
-    
-    print(f"共處理 {len(normalized_items)} 筆資料")
-    print("正在生成網頁...")
-    html_content = generate_html(normalized_items)
-    
-    with open(OUTPUT_HTML, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-        
-    print(f"成功！網頁已生成於: {OUTPUT_HTML}")
+    categories = collections.Counter()
+
+    def counted(items):
+        for item in items:
+            categories[item["category"]] += 1
+            yield item
+
+    data_dir = os.path.join(os.path.dirname(OUTPUT_HTML), SHARD_DIR)
+    payload = shards = None
+    if args.shard_size:
+        payload = shards = ShardedPayload(data_dir, args.shard_size)
+    if args.compact:
+        payload = CompactPayload(payload)
+    # 分片模式下網頁沒有完整描述，必須靠索引搜尋
+    search = SearchIndexBuilder(data_dir) if args.search_index or args.shard_size else None
+
+    if args.static_css:
+        _, unsupported = static_stylesheet()
+        if unsupported:
+            print(f"警告: 靜態樣式表不支援以下 class，將不會套用樣式: {' '.join(unsupported)}")
+
+    sw_path = os.path.join(os.path.dirname(OUTPUT_HTML), SERVICE_WORKER)
+    output_hash, size, written = write_html(
+        counted(itertools.chain([first], items)), OUTPUT_HTML, payload, profiler,
+        args.static_css, SERVICE_WORKER if args.sw else None, search)
+
+    stats = {
+        "items": sum(categories.values()),
+        "categories": dict(categories),
+        "output_bytes": {OUTPUT_HTML: size},
+        "output_sha256": output_hash,
+    }
+    print(f"共處理 {stats['items']} 筆資料")
+    if shards is not None:
+        print(f"已輸出 {len(shards.files)} 個資料分片至 {shards.output_dir}")
+        for path in shards.written:
+            stats["output_bytes"][path] = os.path.getsize(path)
+        stats["manifests"] = [os.path.join(shards.output_dir, 'manifest.json')]
+    if search is not None:
+        for path in search.written:
+            stats["output_bytes"][path] = os.path.getsize(path)
+    elif os.path.isdir(data_dir):
+        remove_search_index(data_dir)
+    if optimizer is not None:
+        print(f"圖片: 新產生 {optimizer.created} 張，沿用 {optimizer.reused} 張")
+        fetcher = optimizer.fetcher
+        if fetcher is not None:
+            print(f"外部圖片: 下載 {fetcher.downloaded} 張，重新驗證 {fetcher.revalidated} 張，"
+                  f"使用快取 {fetcher.cached} 張，失敗 {fetcher.failed} 張")
+    if args.sw:
+        assets = [shards.url_base + name for name in shards.versioned_files()] if shards else []
+        assets += [search.url_base + name for name in search.versioned_files()] if search else []
+        assets += optimizer.thumbnails() if optimizer else []
+        write_service_worker(sw_path, [[os.path.basename(OUTPUT_HTML), output_hash[:12]]], assets)
+        stats["output_bytes"][sw_path] = os.path.getsize(sw_path)
+        print(f"Service worker: 預先快取網頁與 {len(assets)} 個檔案 ({sw_path})")
+    elif os.path.exists(sw_path):
+        _remove_with_siblings(sw_path)
+    if not written:
+        print(f"網頁內容未變動，略過寫入: {OUTPUT_HTML}")
+        return stats
+    print(f"成功！網頁已生成於: {OUTPUT_HTML} ({size} bytes, sha256 {output_hash[:12]})")
+    return stats
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file